@@ -2,13 +2,33 @@ from __future__ import annotations
 
 import inspect
 import json
+import threading
 import traceback
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import (
+    as_completed,
+    wait,
+    FIRST_COMPLETED,
+    Future,
+)
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from functools import wraps
+from functools import wraps, cached_property
+from itertools import islice
 from pathlib import Path
 from pprint import pformat
-from typing import Iterable, Any, final, Callable, TypeVar, Optional, ParamSpec, cast
+from typing import (
+    Iterable,
+    Iterator,
+    Any,
+    final,
+    Callable,
+    TypeVar,
+    Optional,
+    ParamSpec,
+    cast,
+    Hashable,
+)
 from uuid import UUID
 
 import tenacity
@@ -16,17 +36,32 @@ from loguru import logger
 from typing_extensions import Self
 
 from app import log_dir
-from app.my_block import is_template
+from app.my_block import DatabaseEnum
+from app.service.change_detection_service import ChangeDetectionService
+from app.service.template_service import template_service
 from notion_df.contents import (
     ParagraphBlockContents,
     ToggleBlockContents,
     CodeBlockContents,
     DividerBlockContents,
+    NestedBlockContents,
+)
+from notion_df.core.collection import Paginator
+from notion_df.core.entity_core import retrieval_tracker
+from notion_df.core.metrics import (
+    ContextThreadPoolExecutor,
+    attribute,
+    request_metrics,
 )
 from notion_df.core.misc import repr_object
 from notion_df.core.serialization import deserialize_datetime
 from notion_df.core.variable import print_width, my_tz
-from notion_df.entity import Page, Workspace, Block
+from notion_df.data import PageData
+from notion_df.entity import Page, Block, Database
+from notion_df.property import (
+    RelationPagePropertyValue,
+    DualRelationDatabasePropertyValue,
+)
 from notion_df.rich_text import RichText, TextSpan, UserMention
 from notion_df.user import PartialUser
 
@@ -44,6 +79,7 @@ def entrypoint(func: Callable[P, T]) -> Callable[P, Optional[T]]:
     therefore, it can be used as the program entrypoint."""
 
     def get_latest_log_path() -> Optional[Path]:
+        log_dir.mkdir(parents=True, exist_ok=True)
         log_path_list = sorted(log_dir.iterdir())
         if not log_path_list:
             return None
@@ -51,7 +87,7 @@ def entrypoint(func: Callable[P, T]) -> Callable[P, Optional[T]]:
 
     @wraps(func)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> Optional[T]:
-        logger.add(
+        handler_id = logger.add(
             (get_latest_log_path() or (log_dir / "{time}.log")),
             # log_dir / '{time}.log',
             level="DEBUG",
@@ -59,14 +95,24 @@ def entrypoint(func: Callable[P, T]) -> Callable[P, Optional[T]]:
             retention=timedelta(weeks=2),
         )
         logger.info(f'{"#" * 5} Start.')
-        with logger.catch(reraise=True):
-            try:
-                ret = func(*args, **kwargs)
-                logger.info(f'{"#" * 5} Done.')
-                return ret
-            except ActionSkipException as e:
-                logger.info(f'{"#" * 5} Skipped : {e.args[0]}')
-                return None
+        action_name = type(args[0]).__name__ if args else ""
+        try:
+            with (
+                logger.catch(reraise=True),
+                attribute(action_name),
+                retrieval_tracker.track(),
+                request_metrics.track(),
+            ):
+                try:
+                    ret = func(*args, **kwargs)
+                    logger.info(f'{"#" * 5} Done.')
+                    return ret
+                except ActionSkipException as e:
+                    logger.info(f'{"#" * 5} Skipped : {e.args[0]}')
+                    return None
+        finally:
+            # the process may call another entrypoint (ex: app.routine.main)
+            logger.remove(handler_id)
 
     wrapper.__signature__ = inspect.signature(func)
     return cast(Callable[P, Optional[T]], wrapper)
@@ -75,7 +121,6 @@ def entrypoint(func: Callable[P, T]) -> Callable[P, Optional[T]]:
 class ActionRecord:
     user = PartialUser(UUID("a007d150-bc67-422c-87db-030a71867dd9"))
     page = Page("6d16dc6747394fca95dc169c8c736e2d")
-    page_block = page.as_block()
     last_success_time_parent_block = Block("c66d852e27e84d92b6203dfdadfefad8")
     date_format = "%Y-%m-%d %H:%M:%S+09:00"
     date_group_format = "%Y-%m-%d"
@@ -106,6 +151,11 @@ class ActionRecord:
         else:
             self.last_success_time = deserialize_datetime(self.last_execution_time_str)
 
+    @cached_property
+    def page_block(self) -> Block:
+        # Page.as_block() retrieves the page; do not call it on import
+        return self.page.as_block()
+
     def __enter__(self) -> Self:
         return self
 
@@ -180,15 +230,73 @@ class ActionRecord:
                 block.delete(ignore_archived=True)
         assert isinstance(log_group_block, Block)
 
-        summary_block = log_group_block.append_children([summary_block_value])[0]
-        if child_block_values:
-            summary_block.append_children(child_block_values)
+        log_group_block.append_children(
+            [NestedBlockContents(summary_block_value, child_block_values)]
+        )
+
+
+Resource = tuple[Database, Optional[str]]
+"""(database, property name). the property name None means the whole database,
+and "title" means the title property of the database (same as its property id)."""
+
+
+@dataclass
+class ActionScope:
+    """the databases and properties an action reads and writes.
+    page creations through the shared namespaces (ex: DateINamespace) are not counted as writes,
+    since the namespaces are internally synchronized."""
+
+    reads: set[Resource] = field(default_factory=set)
+    writes: set[Resource] = field(default_factory=set)
+
+    def __or__(self, other: ActionScope) -> ActionScope:
+        return ActionScope(self.reads | other.reads, self.writes | other.writes)
+
+    def with_synced_writes(self) -> ActionScope:
+        """a write on a dual relation also changes its synced property on the related database."""
+        return ActionScope(self.reads, self.writes | _get_synced_resources(self.writes))
+
+    def depends_on(self, earlier: ActionScope) -> bool:
+        """whether this should run after the earlier one."""
+        return (
+            _overlaps(earlier.writes, self.reads)  # read-after-write
+            or _overlaps(earlier.reads, self.writes)  # write-after-read
+            or _overlaps(earlier.writes, self.writes)  # write-after-write
+        )
+
+
+def _get_synced_resources(resources: set[Resource]) -> set[Resource]:
+    """the synced side of the dual relations among the resources. retrieves the database schemas."""
+    synced_resources = set()
+    for database, prop_name in resources:
+        for prop, prop_value in database.properties.items():
+            if (prop_name is None or prop.name == prop_name) and isinstance(
+                prop_value, DualRelationDatabasePropertyValue
+            ):
+                synced_resources.add(
+                    (prop_value.database, prop_value.synced_property.name)
+                )
+    return synced_resources
+
+
+def _overlaps(resources_1: set[Resource], resources_2: set[Resource]) -> bool:
+    for database_1, prop_name_1 in resources_1:
+        for database_2, prop_name_2 in resources_2:
+            if database_1 == database_2 and (
+                prop_name_1 is None or prop_name_2 is None or prop_name_1 == prop_name_2
+            ):
+                return True
+    return False
 
 
 class Action(metaclass=ABCMeta):
     def __repr__(self) -> str:
         return repr_object(self)
 
+    def get_scope(self) -> Optional[ActionScope]:
+        """if None, the action is regarded to read and write everything."""
+        return None
+
     @abstractmethod
     def process_pages(self, pages: Iterable[Page]) -> Any:
         """process the given pages."""
@@ -203,22 +311,27 @@ class Action(metaclass=ABCMeta):
     def process_by_last_edited_time(
         self, lower_bound: datetime, upper_bound: Optional[datetime] = None
     ) -> Any:
-        """process with last-edited-time-based search query.
+        """process with last-edited-time-based query.
         Note: Notion APIs' last_edited_time info is only with minutes resolution"""
         logger.info(
             f"{self}.process_by_last_edited_time(): lower_bound - {lower_bound}, upper_bound - {upper_bound}"
         )
         lower_bound = lower_bound.replace(second=0, microsecond=0)
-        pages = set()
-        for page in Workspace().search_by_title("", "page", page_size=30):
-            if upper_bound is not None and page.last_edited_time > upper_bound:
-                continue
-            if page.last_edited_time < lower_bound:
-                break
-            pages.add(page)
+        pages = ChangeDetectionService(
+            (database_enum.entity for database_enum in DatabaseEnum),
+            # only the action without a scope may process the pages outside the known databases
+            search_outside=self.get_scope() is None,
+        ).find(lower_bound, upper_bound)
         logger.debug(f"Before filtered - {pformat(pages, width=print_width)}")
         pages.discard(ActionRecord.page)
-        pages = {page for page in pages if not is_template(page)}
+        template_service.prefetch(
+            {
+                page.data.parent
+                for page in pages
+                if isinstance(page.data.parent, Database)
+            }
+        )
+        pages = set(template_service.filter(pages))
         if not pages:
             raise ActionSkipException("No new record.")
         logger.debug(f"After filtered - {pformat(pages, width=print_width)}")
@@ -254,27 +367,157 @@ class Action(metaclass=ABCMeta):
 
 
 class CompositeAction(Action):
-    def __init__(self, actions: list[Action]) -> None:
+    def __init__(self, actions: list[Action], max_workers: int = 1) -> None:
         self.actions = actions
+        self.max_workers = max_workers
+        """the number of child actions run concurrently. if 1, child actions run one by one.
+        otherwise, only the actions with dependency (see ActionScope) keep their order."""
 
-    def process_all(self) -> Any:
-        logger.info(f"#### {self}")
+    def get_scope(self) -> Optional[ActionScope]:
+        scope = ActionScope()
         for action in self.actions:
-            action.process_all()
+            if (action_scope := action.get_scope()) is None:
+                return None
+            scope |= action_scope
+        return scope
 
-    def process_pages(self, pages: Iterable[Page]) -> Any:
+    def process_all(self) -> list[Any]:
         logger.info(f"#### {self}")
-        for action in self.actions:
-            action.process_pages(pages)
+        return self._run_actions(lambda action: action.process_all())
+
+    def process_pages(self, pages: Iterable[Page]) -> list[Any]:
+        logger.info(f"#### {self}")
+        snapshot = PageSnapshot(pages, max_workers=max(self.max_workers, 4))
+        return self._run_actions(
+            lambda action: action.process_pages(snapshot.view(action.get_scope()))
+        )
+
+    def _run_actions(self, _run: Callable[[Action], Any]) -> list[Any]:
+        """return the results of the child actions, in the same order."""
+
+        def run(action: Action) -> Any:
+            # the requests are counted per child action (see request_metrics)
+            with attribute(type(action).__name__):
+                return _run(action)
+
+        if self.max_workers <= 1:
+            return [run(action) for action in self.actions]
+
+        results: list[Any] = [None] * len(self.actions)
+
+        remaining_dependencies = {
+            i: dependencies
+            for i, dependencies in enumerate(get_dependencies(self.actions))
+        }
+        running: dict[Future, int] = {}
+        with ContextThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=type(self).__name__
+        ) as executor:
+
+            def submit_ready_actions() -> None:
+                for _i, _dependencies in list(remaining_dependencies.items()):
+                    if not _dependencies:
+                        del remaining_dependencies[_i]
+                        running[executor.submit(run, self.actions[_i])] = _i
+
+            submit_ready_actions()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    try:
+                        results[i] = future.result()
+                    except BaseException:
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        raise
+                    for dependencies in remaining_dependencies.values():
+                        dependencies.discard(i)
+                submit_ready_actions()
+        return results
+
+
+class PageSnapshot:
+    """the run-scoped set of pages, shared by the child actions of CompositeAction.
+
+    - the data of the pages are loaded at once, concurrently.
+    - each action gets only the pages under the databases of its scope.
+    - before handing out the pages, re-retrieve only the ones went stale by the earlier actions.
+      the pages edited by `Page.update()` are already up-to-date by its response,
+      but the other side of their dual relations are not."""
+
+    def __init__(self, pages: Iterable[Page], max_workers: int):
+        self.pages: list[Page] = list(dict.fromkeys(pages))
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._retrieve_all([page for page in self.pages if not page.local_data])
+        self._checked_data: dict[Page, PageData] = {
+            page: page.local_data for page in self.pages
+        }
+
+    def view(self, scope: Optional[ActionScope]) -> list[Page]:
+        with self._lock:
+            self._refresh()
+            if scope is None:
+                return list(self.pages)
+            databases = {database for database, _ in scope.reads | scope.writes}
+            return [page for page in self.pages if page.parent in databases]
+
+    def _refresh(self) -> None:
+        stale_pages: set[Page] = set()
+        for page, checked_data in self._checked_data.items():
+            if (data := page.local_data) is checked_data:
+                continue
+            for prop, prop_value in data.properties.items():
+                if not isinstance(prop_value, RelationPagePropertyValue):
+                    continue
+                checked_prop_value = checked_data.properties.get(prop, ())
+                for linked_page in {*prop_value} ^ {*checked_prop_value}:
+                    if (
+                        linked_page in self._checked_data
+                        and linked_page.local_data.timestamp <= data.timestamp
+                    ):
+                        stale_pages.add(linked_page)
+        if stale_pages:
+            logger.debug(f"{type(self).__name__} - refresh {stale_pages}")
+            self._retrieve_all(stale_pages)
+        self._checked_data = {page: page.local_data for page in self.pages}
+
+    def _retrieve_all(self, pages: Iterable[Page]) -> None:
+        with ContextThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=type(self).__name__
+        ) as executor:
+            for _ in executor.map(Page.retrieve, pages):
+                pass
+
+
+def get_dependencies(actions: list[Action]) -> list[set[int]]:
+    """for each action, return the indices of the earlier actions it should wait for."""
+    scopes = [
+        scope.with_synced_writes() if (scope := action.get_scope()) else None
+        for action in actions
+    ]
+    dependencies_list = []
+    for i, scope in enumerate(scopes):
+        dependencies = set()
+        for j, earlier_scope in enumerate(scopes[:i]):
+            if (
+                scope is None
+                or earlier_scope is None
+                or scope.depends_on(earlier_scope)
+            ):
+                dependencies.add(j)
+        dependencies_list.append(dependencies)
+    return dependencies_list
 
 
 class IndividualAction(Action):
     @final
     def process_all(self) -> Any:
         logger.info(f"#### {self}")
-        return self.process_pages(
-            page for page in self.query() if not is_template(page)
-        )
+        pages = self.query()
+        if isinstance(pages, Paginator):
+            pages = pages.stream()
+        return self.process_pages(template_service.filter(pages))
 
     @abstractmethod
     def query(self) -> Iterable[Page]:
@@ -282,12 +525,74 @@ class IndividualAction(Action):
 
 
 class SequentialAction(IndividualAction):
+    max_workers: int = 1
+    """the number of pages processed concurrently. if 1, pages are processed one by one.
+    every worker shares `notion_df.core.request_core.rate_limiter`."""
+    prepare_chunk_size: int = 100
+    """the number of pages given to each prepare() call, which keeps the streamed pages bounded in memory."""
+
     @final
     def process_pages(self, pages: Iterable[Page]) -> Any:
         logger.info(f"#### {self}")
+        pages = self._iter_prepared(pages)
+        if self.max_workers <= 1:
+            for page in pages:
+                self._process_page(page)
+            self.finish()
+            return
+
+        # pages with the same order key are processed one by one, in the given order.
+        lanes: dict[Hashable, list[Page]] = {}
         for page in pages:
+            lanes.setdefault(self.get_order_key(page), []).append(page)
+        stopped = threading.Event()
+
+        def process_lane(lane: list[Page]) -> None:
+            for _page in lane:
+                if stopped.is_set():
+                    return
+                self._process_page(_page)
+
+        with ContextThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=type(self).__name__
+        ) as executor:
+            futures = [executor.submit(process_lane, lane) for lane in lanes.values()]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                # fail fast, like the sequential mode
+                stopped.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+        self.finish()
+
+    def _iter_prepared(self, pages: Iterable[Page]) -> Iterator[Page]:
+        iterator = iter(pages)
+        while chunk := list(islice(iterator, self.prepare_chunk_size)):
+            self.prepare(chunk)
+            yield from chunk
+
+    def _process_page(self, page: Page) -> None:
+        try:
             self.process_page(page)
+        except Exception as e:
+            e.add_note(f"{self}.process_page({page})")
+            raise
 
     @abstractmethod
     def process_page(self, page: Page) -> Any:
         pass
+
+    def prepare(self, pages: list[Page]) -> None:
+        """called on each chunk of the pages before they are processed. prefetch what they need in bulk here."""
+        pass
+
+    def finish(self) -> None:
+        """called after every page is processed."""
+        pass
+
+    def get_order_key(self, page: Page) -> Hashable:
+        """pages with the same key are never processed concurrently.
+        override this if process_page() edits another page than the given one."""
+        return page
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import datetime as dt
+
 from app import backup_dir
 from app.action.__core__ import CompositeAction
 from app.action.match import (
@@ -26,7 +28,7 @@ from app.my_block import (
     thread_needs_sch_datei_prop,
 )
 
-base = MatchActionBase()
+base = MatchActionBase(preload_window=dt.timedelta(days=60))
 routine_action = CompositeAction(
     [
         MigrationBackupLoadAction(backup_dir),
@@ -87,7 +89,8 @@ routine_action = CompositeAction(
                                 DatabaseEnum.datei_db.title),
 
         MediaScrapAction(create_window=False),
-    ]
+    ],
+    max_workers=4,
 )
 
 if __name__ == "__main__":
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import datetime as dt
 import re
-from abc import ABCMeta
-from typing import Iterable, Optional, Any, cast
+import threading
+from abc import ABCMeta, abstractmethod
+from typing import Iterable, Optional, Any, cast, Hashable
 
 from loguru import logger
 
-from app.action.__core__ import SequentialAction, Action
+from app.action.__core__ import SequentialAction, Action, ActionScope
 from app.emoji_code import EmojiCode
 from app.my_block import (
     DatabaseEnum,
@@ -38,6 +39,7 @@ from app.my_block import (
     Datei,
 )
 from notion_df.core.collection import Paginator
+from notion_df.core.metrics import ContextThreadPoolExecutor
 from notion_df.core.misc import repr_object
 from notion_df.entity import Page, Database
 from notion_df.filter import created_time_filter
@@ -47,6 +49,7 @@ from notion_df.property import (
     PageProperties,
     CheckboxProperty,
     CheckboxFormulaProperty,
+    DateProperty,
 )
 from notion_df.rich_text import TextSpan, RichText
 
@@ -57,9 +60,9 @@ from notion_df.rich_text import TextSpan, RichText
 
 
 class MatchActionBase:
-    def __init__(self):
-        self.date_namespace = DateINamespace()
-        self.week_namespace = WeekINamespace()
+    def __init__(self, preload_window: Optional[dt.timedelta] = None):
+        self.date_namespace = DateINamespace(preload_window)
+        self.week_namespace = WeekINamespace(preload_window)
 
 
 class MatchAction(Action, metaclass=ABCMeta):
@@ -70,7 +73,7 @@ class MatchAction(Action, metaclass=ABCMeta):
 
 
 class MatchSequentialAction(MatchAction, SequentialAction, metaclass=ABCMeta):
-    pass
+    max_workers = 4
 
 
 last_edited_time_checkbox = CheckboxProperty("🟣오늘")
@@ -89,6 +92,13 @@ class MatchRecordDateiByLastEditedTime(MatchSequentialAction):
     def query(self) -> Iterable[Page]:
         return self.record_db.query(last_edited_time_checkbox.filter.is_not_empty())
 
+    def get_scope(self) -> ActionScope:
+        resources = {
+            (self.record_db, last_edited_time_checkbox.name),
+            (self.record_db, self.record_to_datei.name),
+        }
+        return ActionScope(reads=resources, writes=resources)
+
     def process_page(self, record: Page) -> None:
         if record.parent != self.record_db:
             return
@@ -142,6 +152,30 @@ class MatchRecordDateiByCreatedTime(MatchSequentialAction):
             )
         )
 
+    def get_scope(self) -> ActionScope:
+        reads = {(self.record_db, self.record_to_datei.name)}
+        if self.only_if_this_checkbox_filled:
+            reads.add((self.record_db, self.only_if_this_checkbox_filled.name))
+        return ActionScope(
+            reads=reads, writes={(self.record_db, self.record_to_datei.name)}
+        )
+
+    def prepare(self, pages: list[Page]) -> None:
+        # find or create the dateis at once, instead of one by one in the page loop
+        self.date_namespace.get_pages_by_dates(
+            {
+                get_record_created_date(record)
+                for record in pages
+                if record.parent == self.record_db
+                and not (self.only_if_empty and record.properties[self.record_to_datei])
+                and (
+                    not self.only_if_this_checkbox_filled
+                    or record.properties[self.only_if_this_checkbox_filled]
+                )
+            },
+            max_workers=self.max_workers,
+        )
+
     def process_page(self, record: Page) -> None:
         if record.parent != self.record_db:
             return
@@ -198,6 +232,15 @@ class MatchRecordDateiByTitle(MatchSequentialAction):
     def query(self) -> Paginator[Page]:
         return self.record_db.query()
 
+    def get_scope(self) -> ActionScope:
+        return ActionScope(
+            reads={
+                (self.record_db, "title"),
+                (self.record_db, self.record_to_datei.name),
+            },
+            writes={(self.record_db, self.record_to_datei.name)},
+        )
+
     def process_page(self, record: Page) -> Any:
         if record.parent != self.record_db:
             return
@@ -236,6 +279,18 @@ class PrependDateiOnRecordTitle(MatchSequentialAction):
     def query(self) -> Paginator[Page]:
         return self.record_db.query(filter=self.record_to_datei.filter.is_not_empty())
 
+    def get_scope(self) -> ActionScope:
+        return ActionScope(
+            reads={
+                (self.record_db, "title"),
+                (self.record_db, self.record_to_datei.name),
+                (self.record_db, thread_needs_sch_datei_prop.name),
+                (self.record_db, record_kind_prop.name),
+                (DatabaseEnum.datei_db.entity, datei_date_prop.name),
+            },
+            writes={(self.record_db, "title")},
+        )
+
     def process_page(self, record: Page) -> None:
         if record.parent != self.record_db:
             return
@@ -275,6 +330,15 @@ class CopyRecordRel(MatchSequentialAction):
     def query(self) -> Iterable[Page]:
         return self.record_db.query(self.record_to_src_datei_prop.filter.is_not_empty())
 
+    def get_scope(self) -> ActionScope:
+        return ActionScope(
+            reads={
+                (self.record_db, self.record_to_datei_prop.name),
+                (self.record_db, self.record_to_src_datei_prop.name),
+            },
+            writes={(self.record_db, self.record_to_datei_prop.name)},
+        )
+
     def process_page(self, record: Page) -> Any:
         if not (record.parent == self.record_db):
             return
@@ -304,6 +368,16 @@ class MatchReadingStartDatei(MatchSequentialAction):
             )
         )
 
+    def get_scope(self) -> ActionScope:
+        return ActionScope(
+            reads={
+                (self.reading_db, None),
+                (self.event_db, record_to_datei_prop.name),
+                (DatabaseEnum.datei_db.entity, datei_date_prop.name),
+            },
+            writes={(self.reading_db, reading_to_start_date_prop.name)},
+        )
+
     def process_page(self, reading: Page) -> None:
         if not (
             reading.parent == self.reading_db
@@ -375,6 +449,16 @@ class MatchRecordTimestr(MatchSequentialAction):
             & created_time_filter.equals(dt.date.today())
         )
 
+    def get_scope(self) -> ActionScope:
+        return ActionScope(
+            reads={
+                (self.record_db, record_timestr_prop.name),
+                (self.record_db, self.record_to_datei.name),
+                (DatabaseEnum.datei_db.entity, datei_date_prop.name),
+            },
+            writes={(self.record_db, record_timestr_prop.name)},
+        )
+
     def will_process(self, record: Page) -> bool:
         if not (
             record.parent == self.record_db
@@ -442,6 +526,16 @@ class MatchRecordWeekiByDatei(MatchSequentialAction):
             & self.record_to_datei.filter.is_not_empty()
         )
 
+    def get_scope(self) -> ActionScope:
+        return ActionScope(
+            reads={
+                (self.record_db, self.record_to_datei.name),
+                (self.record_db, self.record_to_weeki.name),
+                (DatabaseEnum.datei_db.entity, datei_to_weeki_prop.name),
+            },
+            writes={(self.record_db, self.record_to_weeki.name)},
+        )
+
     def process_page(self, record: Page) -> None:
         if not (
             record.parent == self.record_db and record.properties[self.record_to_datei]
@@ -485,6 +579,16 @@ class MatchDatei(MatchSequentialAction):
             datei_date_prop.filter.is_empty() or datei_to_weeki_prop.filter.is_empty()
         )
 
+    def get_scope(self) -> ActionScope:
+        return ActionScope(
+            reads={(self.date_db, None)},
+            writes={
+                (self.date_db, "title"),
+                (self.date_db, datei_date_prop.name),
+                (self.date_db, datei_to_weeki_prop.name),
+            },
+        )
+
     def process_page(self, datei: Page) -> None:
         if datei.parent != self.date_db:
             return
@@ -537,6 +641,13 @@ class CopyEventRelsToTarget(MatchSequentialAction):
             filter=self.event_to_target_prop.filter.is_not_empty()
         )
 
+    def get_scope(self) -> ActionScope:
+        # the relation props are resolved on runtime
+        return ActionScope(
+            reads={(self.event_db, None), (self.target_db, None)},
+            writes={(self.target_db, None)},
+        )
+
     def process_page(self, event: Page) -> Any:
         if event.parent != self.event_db:
             return
@@ -592,6 +703,14 @@ class CopyEventRelsToTarget(MatchSequentialAction):
         logger.info(f"{target} <--Copy-- progress {event} : {target_new_properties}")
         target.update(properties=target_new_properties)
 
+    def get_order_key(self, event: Page) -> Hashable:
+        # events with the same target should not overwrite each other's edit
+        if event.parent != self.event_db:
+            return event
+        if target_list := event.properties[self.event_to_target_prop]:
+            return target_list[0]
+        return event
+
 
 class ReplaceMentionToLinks(MatchSequentialAction):
     # TODO: currently unused. find alternative way without editing blocks.
@@ -616,11 +735,15 @@ class DatabaseNamespace(metaclass=ABCMeta):
         self.database = database.entity
         self.title_prop = TitleProperty(title_prop)
         self.pages_by_title_plain_text: dict[str, Page] = {}
+        self._lock = threading.RLock()
+        """prevents creating duplicate pages from concurrent process_page() calls."""
 
     def get_page_by_title(self, title_plain_text: str) -> Optional[Page]:
         if page := self.pages_by_title_plain_text.get(title_plain_text):
             return page
-        page_list = self.database.query(self.title_prop.filter.equals(title_plain_text))
+        page_list = self.database.query(
+            self.title_prop.filter.equals(title_plain_text), limit=1
+        )
         if not page_list:
             return None
         page = page_list[0]
@@ -628,17 +751,130 @@ class DatabaseNamespace(metaclass=ABCMeta):
         return page
 
 
-class DateINamespace(DatabaseNamespace):
-    def __init__(self):
-        super().__init__(DatabaseEnum.datei_db, EmojiCode.GREEN_BOOK + "제목")
+class DateIndexedNamespace(DatabaseNamespace, metaclass=ABCMeta):
+    """the pages are also indexed by their date.
+    after preload(), the lookups inside the preloaded window need no request."""
+
+    def __init__(
+        self,
+        database: DatabaseEnum,
+        title_prop: str,
+        date_prop: DateProperty,
+        preload_window: Optional[dt.timedelta] = None,
+    ):
+        super().__init__(database, title_prop)
+        self.date_prop = date_prop
+        self.preload_window = preload_window
+        """if set, a lookup outside the preloaded windows preloads the window around the date."""
+        self.pages_by_date: dict[dt.date, Page] = {}
+        """the key is get_key_date() of the page's date."""
+        self.preloaded_windows: list[tuple[dt.date, dt.date]] = []
+        """the key dates of the preloaded pages."""
+
+    @abstractmethod
+    def get_key_date(self, date: dt.date) -> dt.date:
+        """the date which represents the page of the given date."""
+        pass
+
+    @abstractmethod
+    def get_title(self, date: dt.date) -> str:
+        pass
+
+    @abstractmethod
+    def create_page(self, title_plain_text: str, date: dt.date) -> Page:
+        """should call _index_page() on the new page."""
+        pass
+
+    def preload(
+        self, start: Optional[dt.date] = None, end: Optional[dt.date] = None
+    ) -> None:
+        """load every page of the window at once. if start and end are None, load the whole database."""
+        logger.info(f"{type(self).__name__}.preload({start=}, {end=})")
+        # the query window is widened by a week, to cover the date ranges across the edges
+        margin = dt.timedelta(days=7)
+        filter_ = None
+        if start is not None:
+            filter_ = self.date_prop.filter.on_or_after(start - margin)
+        if end is not None:
+            end_filter = self.date_prop.filter.on_or_before(end + margin)
+            filter_ = end_filter if filter_ is None else filter_ & end_filter
+        pages = list(self.database.query(filter_))
+        with self._lock:
+            for page in pages:
+                self._index_page(page)
+            self.preloaded_windows.append((start or dt.date.min, end or dt.date.max))
+
+    def _index_page(self, page: Page) -> None:
+        self.pages_by_title_plain_text[page.properties.title.plain_text] = page
+        # some new manually created pages can have empty values
+        date_range = page.properties[self.date_prop]
+        if date_range is not None and (date := date_range.start):
+            if isinstance(date, dt.datetime):
+                date = date.date()
+            self.pages_by_date[self.get_key_date(date)] = page
+
+    def _is_preloaded(self, date: dt.date) -> bool:
+        key_date = self.get_key_date(date)
+        return any(start <= key_date <= end for start, end in self.preloaded_windows)
+
+    def _find_page(self, date: dt.date) -> Optional[Page]:
+        if page := self.pages_by_date.get(self.get_key_date(date)):
+            return page
+        if self.preload_window is not None and not self._is_preloaded(date):
+            self.preload(date - self.preload_window, date + self.preload_window)
+            if page := self.pages_by_date.get(self.get_key_date(date)):
+                return page
+        # the preload misses the pages with empty date, such as the manually created ones
+        return self.get_page_by_title(self.get_title(date))
 
     def get_page_by_date(self, date: dt.date) -> Page:
-        day_name = korean_weekday[date.weekday()] + "요일"
-        title_plain_text = f'{date.strftime("%y%m%d")} {day_name}'
-        return self.get_page_by_title(title_plain_text) or self.create_page(
-            title_plain_text, date
+        with self._lock:
+            return self._find_page(date) or self.create_page(self.get_title(date), date)
+
+    def get_pages_by_dates(
+        self, dates: Iterable[dt.date], max_workers: int = 4
+    ) -> dict[dt.date, Page]:
+        """the missing pages are created concurrently."""
+        dates_by_key_date = {self.get_key_date(date): date for date in dates}
+        with self._lock:
+            pages_by_key_date = {}
+            missing_dates = []
+            for key_date, date in dates_by_key_date.items():
+                if page := self._find_page(date):
+                    pages_by_key_date[key_date] = page
+                else:
+                    missing_dates.append(date)
+            with ContextThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=type(self).__name__
+            ) as executor:
+                new_pages = executor.map(
+                    lambda _date: self.create_page(self.get_title(_date), _date),
+                    missing_dates,
+                )
+                for date, page in zip(missing_dates, new_pages):
+                    pages_by_key_date[self.get_key_date(date)] = page
+        return {
+            date: pages_by_key_date[self.get_key_date(date)]
+            for date in dates_by_key_date.values()
+        }
+
+
+class DateINamespace(DateIndexedNamespace):
+    def __init__(self, preload_window: Optional[dt.timedelta] = None):
+        super().__init__(
+            DatabaseEnum.datei_db,
+            EmojiCode.GREEN_BOOK + "제목",
+            datei_date_prop,
+            preload_window,
         )
 
+    def get_key_date(self, date: dt.date) -> dt.date:
+        return date
+
+    def get_title(self, date: dt.date) -> str:
+        day_name = korean_weekday[date.weekday()] + "요일"
+        return f'{date.strftime("%y%m%d")} {day_name}'
+
     def create_page(self, title_plain_text: str, date: dt.date) -> Page:
         page = self.database.create_child_page(
             PageProperties(
@@ -650,7 +886,7 @@ class DateINamespace(DatabaseNamespace):
                 }
             )
         )
-        self.pages_by_title_plain_text[page.properties.title.plain_text] = page
+        self._index_page(page)
         return page
 
     @classmethod
@@ -740,16 +976,21 @@ class DateINamespace(DatabaseNamespace):
         )
 
 
-class WeekINamespace(DatabaseNamespace):
-    def __init__(self):
-        super().__init__(DatabaseEnum.weeki_db, EmojiCode.GREEN_BOOK + "제목")
-
-    def get_page_by_date(self, date: dt.date) -> Page:
-        title_plain_text = self._get_first_day_of_week(date).strftime("%y_%U")
-        return self.get_page_by_title(title_plain_text) or self.create_page(
-            title_plain_text, date
+class WeekINamespace(DateIndexedNamespace):
+    def __init__(self, preload_window: Optional[dt.timedelta] = None):
+        super().__init__(
+            DatabaseEnum.weeki_db,
+            EmojiCode.GREEN_BOOK + "제목",
+            weeki_date_range_prop,
+            preload_window,
         )
 
+    def get_key_date(self, date: dt.date) -> dt.date:
+        return self._get_first_day_of_week(date)
+
+    def get_title(self, date: dt.date) -> str:
+        return self._get_first_day_of_week(date).strftime("%y_%U")
+
     def create_page(self, title_plain_text: str, date: dt.date) -> Page:
         page = self.database.create_child_page(
             PageProperties(
@@ -764,7 +1005,7 @@ class WeekINamespace(DatabaseNamespace):
                 }
             )
         )
-        self.pages_by_title_plain_text[page.properties.title.plain_text] = page
+        self._index_page(page)
         return page
 
     @classmethod
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Optional, Literal, TYPE_CHECKING
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, Tag
+
+if TYPE_CHECKING:
+    import requests
+
+LibKey = Literal["all_libs", "gajwa"]
+url_main_page = (
+    "https://www.goyanglib.or.kr/center/menu/10003/program/30001/searchSimple.do"
+)
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests.adapters
+
+            _session = requests.Session()
+            _session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=8))
+        return _session
+
+
+@dataclass
+class LibraryScrapResult:
+    lib_key: LibKey
+    lib_name: str
+    priority: int
+    book_code: str
+    available: bool
+    search_url: str = None
+
+    @classmethod
+    def gajwa(cls, book_code: str, availability: bool) -> LibraryScrapResult:
+        return cls("gajwa", "가좌도서관", 1, book_code, availability)
+
+    @classmethod
+    def gy_all_libs(cls, book_code: str, availability: bool) -> LibraryScrapResult:
+        return cls("all_libs", "고양시 상호대차", -1, book_code, availability)
+
+    @property
+    def location_str(self) -> str:
+        if self.lib_key == "gajwa":
+            vals = [self.lib_name, self.book_code, self.availability_str]
+        else:
+            vals = [self.lib_name, self.availability_str]
+        return " ".join(val for val in vals if val)
+
+    @property
+    def availability_str(self) -> str:
+        return "가능" if self.available else "불가능"
+
+
+class UnexpectedPageError(Exception):
+    """the page is not in the expected shape, possibly rendered by JavaScript.
+    the caller should fall back to GYLibraryScraper."""
+
+    pass
+
+
+class GYLibraryHTTPScraper:
+    """the same search as GYLibraryScraper, by submitting the search form with plain HTTP requests."""
+
+    def __init__(
+        self,
+        title: str,
+        lib_key: LibKey,
+        *,
+        timeout: float = 10,
+        max_pages: int = 30,
+        session: Optional[requests.Session] = None,
+    ):
+        self.title = title
+        self.lib_key = lib_key
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.session = session or get_session()
+
+    def execute(self) -> Optional[LibraryScrapResult]:
+        if not self.title:
+            return
+        response = self.session.get(url_main_page, timeout=self.timeout)
+        response.raise_for_status()
+        method, url, params = self.get_search_form(response.text, response.url)
+        if method == "post":
+            response = self.session.post(url, data=params, timeout=self.timeout)
+        else:
+            response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+
+        search_url = response.url
+        result: Optional[LibraryScrapResult] = None
+        for _ in range(self.max_pages):
+            soup = BeautifulSoup(response.text, "html.parser")
+            if soup.select_one(".noResultNote"):
+                return
+            if soup.select_one("#bookList") is None:
+                raise UnexpectedPageError(response.url)
+            for book_area in soup.select(
+                "#bookList > div.bookList.listViewStyle > ul > li > div.bookArea"
+            ):
+                result = self.parse_book_area(book_area)
+                # if all_libs, should proceed until element with availability=True arises.
+                if self.lib_key == "gajwa" or result.available:
+                    result.search_url = search_url
+                    return result
+            next_url = self.get_next_page_url(soup, response.url)
+            if next_url is None:
+                break
+            response = self.session.get(next_url, timeout=self.timeout)
+            response.raise_for_status()
+        if result is not None:
+            result.search_url = search_url
+        return result
+
+    def get_search_form(
+        self, html: str, base_url: str
+    ) -> tuple[str, str, list[tuple[str, str]]]:
+        """returns the method, the url and the parameters of the form submission,
+        with the same options as GYLibraryScraper clicks."""
+        soup = BeautifulSoup(html, "html.parser")
+        input_box = soup.select_one("#searchKeyword")
+        form = input_box.find_parent("form") if input_box else None
+        if form is None:
+            raise UnexpectedPageError(base_url)
+        checked = {
+            element.get("id"): element.has_attr("checked")
+            for element in form.select("input[type=checkbox], input[type=radio]")
+        }
+        if self.lib_key == "gajwa":
+            # the same clicks as GYLibraryScraper
+            for element_id in ["searchLibraryAll", "searchManageCodeArr2"]:
+                if element_id not in checked:
+                    raise UnexpectedPageError(base_url)
+                checked[element_id] = not checked[element_id]
+
+        params = []
+        for element in form.select("input[name]"):
+            input_type = element.get("type", "text").lower()
+            if input_type in ["checkbox", "radio"]:
+                if not checked.get(element.get("id"), element.has_attr("checked")):
+                    continue
+            elif input_type in ["submit", "button", "image", "reset", "file"]:
+                continue
+            value = self.title if element is input_box else element.get("value", "")
+            params.append((element["name"], value))
+        for element in form.select("select[name]"):
+            option = element.select_one("option[selected]") or element.select_one(
+                "option"
+            )
+            if option is not None:
+                params.append((element["name"], option.get("value", option.text)))
+        method = form.get("method", "get").lower()
+        return method, urljoin(base_url, form.get("action") or base_url), params
+
+    def parse_book_area(self, book_area: Tag) -> LibraryScrapResult:
+        book_code_element = book_area.select_one(
+            "div.bookData > div > div > p.kor.on > span:nth-child(3)"
+        )
+        book_code = get_text(book_code_element) if book_code_element else ""
+        availability_element = book_area.select_one(
+            "div.bookData > div > ul > li.title > span > strong"
+        )
+        available = bool(
+            availability_element and "대출가능" in get_text(availability_element)
+        )
+        if self.lib_key == "gajwa":
+            return LibraryScrapResult.gajwa(book_code, available)
+        return LibraryScrapResult.gy_all_libs(book_code, available)
+
+    @staticmethod
+    def get_next_page_url(soup: BeautifulSoup, base_url: str) -> Optional[str]:
+        """the link after the current page, or the next page section.
+        raises UnexpectedPageError if the link is not a plain URL, such as a JavaScript call."""
+        paging = soup.select_one("#bookList > div.pagingWrap > p")
+        if paging is None:
+            return
+        current = paging.select_one("strong, a.on, a.active")
+        next_link = None
+        if current is not None:
+            next_link = current.find_next_sibling("a")
+        if next_link is None or "prev" in next_link.get("class", []):
+            next_link = paging.select_one("a.btn-paging.next")
+        if next_link is None:
+            return
+        href = next_link.get("href", "")
+        if not href or href.startswith("javascript") or href == "#":
+            raise UnexpectedPageError(base_url)
+        return urljoin(base_url, href)
+
+
+def get_text(element: Tag) -> str:
+    """the visible text, as WebElement.text."""
+    return " ".join(element.get_text().split())
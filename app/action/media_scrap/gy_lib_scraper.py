@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Literal
+from typing import Optional
 
 from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.chrome.webdriver import WebDriver
@@ -10,41 +9,10 @@ from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
+from app.action.media_scrap.gy_lib_http_scraper import LibKey, LibraryScrapResult
 from app.service.webdriver_service import WebDriverService
 from notion_df.core.collection import StrEnum
 
-LibKey = Literal["all_libs", "gajwa"]
-
-
-@dataclass
-class LibraryScrapResult:
-    lib_key: LibKey
-    lib_name: str
-    priority: int
-    book_code: str
-    available: bool
-    search_url: str = None
-
-    @classmethod
-    def gajwa(cls, book_code: str, availability: bool) -> LibraryScrapResult:
-        return cls("gajwa", "가좌도서관", 1, book_code, availability)
-
-    @classmethod
-    def gy_all_libs(cls, book_code: str, availability: bool) -> LibraryScrapResult:
-        return cls("all_libs", "고양시 상호대차", -1, book_code, availability)
-
-    @property
-    def location_str(self) -> str:
-        if self.lib_key == "gajwa":
-            vals = [self.lib_name, self.book_code, self.availability_str]
-        else:
-            vals = [self.lib_name, self.availability_str]
-        return " ".join(val for val in vals if val)
-
-    @property
-    def availability_str(self) -> str:
-        return "가능" if self.available else "불가능"
-
 
 class GYLibraryCSSTag(StrEnum):
     input_box = "#searchKeyword"
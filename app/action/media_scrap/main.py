@@ -1,17 +1,15 @@
+from __future__ import annotations
+
 import re
-from typing import Optional, Callable, Any, Iterable, cast
+import threading
+from concurrent.futures import wait, FIRST_EXCEPTION
+from typing import Optional, Callable, Any, Iterable, cast, TYPE_CHECKING
 
 from loguru import logger
-from selenium.webdriver.chrome.webdriver import WebDriver
 
-from app.action.media_scrap.gy_lib_scraper import GYLibraryScraper, LibraryScrapResult
-from app.action.media_scrap.yes24_scraper import (
-    get_yes24_detail_page_url,
-    Yes24ScrapResult,
-)
-from app.action.__core__ import IndividualAction
+from app.action.__core__ import IndividualAction, ActionScope
 from app.my_block import DatabaseEnum
-from app.service.webdriver_service import WebDriverService
+from app.service.webdriver_service import WebDriverService, WebDriverPool
 from notion_df.constant import BlockColor
 from notion_df.contents import (
     BlockContents,
@@ -22,6 +20,7 @@ from notion_df.contents import (
 )
 from notion_df.contents import ChildPageBlockContents, TableOfContentsBlockContents
 from notion_df.core.collection import StrEnum, peek, Paginator
+from notion_df.core.metrics import ContextThreadPoolExecutor
 from notion_df.entity import Page
 from notion_df.filter import CompoundFilter
 from notion_df.misc import Annotations, SelectOption
@@ -38,6 +37,9 @@ from notion_df.property import (
 )
 from notion_df.rich_text import RichText, TextSpan
 
+if TYPE_CHECKING:
+    from app.action.media_scrap.gy_lib_http_scraper import LibraryScrapResult, LibKey
+
 edit_status_prop = SelectProperty("📘준비")
 media_type_prop = SelectProperty("📘유형")
 is_book_prop = CheckboxFormulaProperty("📔도서류")
@@ -64,9 +66,22 @@ class EditStatusValue(StrEnum):
 
 
 class MediaScrapAction(IndividualAction):
-    def __init__(self, *, create_window: bool):
+    """the readings are processed concurrently, so that one's yes24 requests overlap with another's library search.
+    each site has its own concurrency limit; the library search is also limited by the number of drivers."""
+
+    def __init__(
+        self,
+        *,
+        create_window: bool,
+        max_drivers: int = 2,
+        max_workers: int = 6,
+        site_limits: Optional[dict[str, int]] = None,
+    ):
         self.reading_db = DatabaseEnum.reading_db.entity
         self.driver_service = WebDriverService(create_window=create_window)
+        self.max_drivers = max_drivers
+        self.max_workers = max_workers
+        self.site_limits = {"yes24": 4, "goyanglib": 4, **(site_limits or {})}
 
     def query(self) -> Paginator[Page]:
         return self.reading_db.query(
@@ -85,6 +100,11 @@ class MediaScrapAction(IndividualAction):
             )
         )
 
+    def get_scope(self) -> ActionScope:
+        return ActionScope(
+            reads={(self.reading_db, None)}, writes={(self.reading_db, None)}
+        )
+
     def filter(self, page: Page) -> bool:
         return (
             page.parent == self.reading_db
@@ -105,15 +125,39 @@ class MediaScrapAction(IndividualAction):
         reading_it = peek(readings)
         if reading_it is None:
             return
-        with self.driver_service.create() as driver:
-            for reading in reading_it:
-                ReadingMediaScraperUnit(reading, driver).execute()
-                logger.info(f"\t{reading}")
+        site_semaphores = {
+            site: threading.BoundedSemaphore(limit)
+            for site, limit in self.site_limits.items()
+        }
+
+        def process_reading(reading: Page) -> None:
+            ReadingMediaScraperUnit(reading, driver_pool, site_semaphores).execute()
+            logger.info(f"\t{reading}")
+
+        with WebDriverPool(self.driver_service, self.max_drivers) as driver_pool:
+            executor = ContextThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=type(self).__name__
+            )
+            try:
+                futures = [
+                    executor.submit(process_reading, reading) for reading in reading_it
+                ]
+                done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in done:
+                    future.result()
+            finally:
+                executor.shutdown(cancel_futures=True)
 
 
 class ReadingMediaScraperUnit:
-    def __init__(self, reading: Page, driver: WebDriver):
-        self.driver = driver
+    def __init__(
+        self,
+        reading: Page,
+        driver_pool: WebDriverPool,
+        site_semaphores: dict[str, threading.Semaphore],
+    ):
+        self.driver_pool = driver_pool
+        self.site_semaphores = site_semaphores
 
         self.reading = reading
         self.new_properties = PageProperties()
@@ -155,6 +199,12 @@ class ReadingMediaScraperUnit:
         self.reading.update(self.new_properties)
 
     def process_yes24(self, overwrite: bool) -> bool:
+        # the scrapers are imported on use, since bs4 and selenium are slow to import
+        from app.action.media_scrap.yes24_scraper import (
+            get_yes24_detail_page_url,
+            Yes24ScrapResult,
+        )
+
         def get_url() -> Optional[str]:
             if url_value := self.reading.properties[url_prop]:
                 return url_value
@@ -165,10 +215,11 @@ class ReadingMediaScraperUnit:
                 self.new_properties[url_prop] = url_value
                 return url_value
 
-        detail_page_url = get_url()
-        if not detail_page_url:
-            return False
-        result = Yes24ScrapResult.scrap(detail_page_url)
+        with self.site_semaphores["yes24"]:
+            detail_page_url = get_url()
+            if not detail_page_url:
+                return False
+            result = Yes24ScrapResult.scrap(detail_page_url)
 
         if result.get_true_name():
             self.true_name_value = result.get_true_name()
@@ -240,31 +291,17 @@ class ReadingMediaScraperUnit:
                     for content_line in result.get_contents()
                 ),
             ]
-            length = 100
-            child_contents_split_list = [
-                child_contents[i : i + length]
-                for i in range(0, len(child_contents), length)
-            ]
-            for child_contents_split in child_contents_split_list:
-                content_page.as_block().append_children(child_contents_split)
+            content_page.as_block().append_children(child_contents)
 
         self.callables.append(set_content_page)
         return True
 
     def process_lib_gy(self, overwrite: bool) -> bool:
         def get_result() -> Optional[LibraryScrapResult]:
-            unit = GYLibraryScraper(self.driver, self.true_name_value, "gajwa")
-            if result := unit.execute():
-                return result
-            unit = GYLibraryScraper(self.driver, self.name_value, "gajwa")
-            if result := unit.execute():
-                return result
-            unit = GYLibraryScraper(self.driver, self.true_name_value, "all_libs")
-            if result := unit.execute():
-                return result
-            unit = GYLibraryScraper(self.driver, self.name_value, "all_libs")
-            if result := unit.execute():
-                return result
+            for lib_key in cast(list[LibKey], ["gajwa", "all_libs"]):
+                for title in [self.true_name_value, self.name_value]:
+                    if result := self.search_lib_gy(title, lib_key):
+                        return result
 
         scrap_result = get_result()
         if scrap_result is None:
@@ -282,6 +319,28 @@ class ReadingMediaScraperUnit:
         self.new_properties.update(new_properties)
         return True
 
+    def search_lib_gy(
+        self, title: str, lib_key: LibKey
+    ) -> Optional[LibraryScrapResult]:
+        """tries the plain HTTP search first, since the browser is slow and heavy.
+        falls back to the browser if the page is unexpected or the request fails (ex: 403, timeout)."""
+        import requests
+
+        from app.action.media_scrap.gy_lib_http_scraper import (
+            GYLibraryHTTPScraper,
+            UnexpectedPageError,
+        )
+
+        with self.site_semaphores["goyanglib"]:
+            try:
+                return GYLibraryHTTPScraper(title, lib_key).execute()
+            except (UnexpectedPageError, requests.RequestException) as e:
+                logger.warning(f"fall back to the browser: {type(e).__name__}: {e}")
+            from app.action.media_scrap.gy_lib_scraper import GYLibraryScraper
+
+            with self.driver_pool.acquire() as driver:
+                return GYLibraryScraper(driver, title, lib_key).execute()
+
     def filter_not_overwrite(self, new_properties: PageProperties):
         return PageProperties(
             {
@@ -1,30 +1,102 @@
 from __future__ import annotations
 
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Literal, Any, Callable, Generic, TypeVar
 from urllib import parse
 
 import requests
 import requests.packages
 from bs4 import BeautifulSoup
 
+from app import cache_dir
+from app.service.http_cache_service import HTTPCacheService
+
 # noinspection PyUnresolvedReferences
 # disable SSLError(1, '[SSL: DH_KEY_TOO_SMALL] dh key too small (_ssl.c:997)') error for yes24.com
 requests.packages.urllib3.util.ssl_.DEFAULT_CIPHERS = "ALL:@SECLEVEL=1"
 
+HTMLParser = Literal["html.parser", "lxml", "html5lib"]
+default_parser: HTMLParser = "html5lib"
+"""the BeautifulSoup parser backend. the selectors do not depend on the implied tags of html5lib, such as <tbody>,
+but keep it until app/script/benchmark_yes24_parser.py shows the parity and the speedup on the saved yes24 pages."""
+http_cache = HTTPCacheService(cache_dir / "yes24")
+ValueT = TypeVar("ValueT")
+
+
+class Memo(Generic[ValueT]):
+    """a thread-safe in-memory LRU cache in front of the disk cache.
+    the entries expire after `ttl`, the same as the disk cache, so that a long-running process sees the updates."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: timedelta,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, ValueT]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ValueT]:
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                return None
+            stored_time, value = entry
+            if self.clock() - stored_time >= self.ttl.total_seconds():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: ValueT) -> None:
+        with self._lock:
+            self._entries[key] = self.clock(), value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+_detail_page_urls: Memo[str] = Memo(1024, http_cache.ttl)
+"""normalized book name -> detail page url. not-found names are not memoized."""
+_scrap_results: Memo[Yes24ScrapResult] = Memo(256, http_cache.ttl)
+"""detail page url -> the parsed result, which holds the whole page."""
+
+
+def normalize_book_name(book_name: str) -> str:
+    book_name = "".join(filter(lambda x: str.isalnum(x) or x == " ", book_name))
+    return " ".join(book_name.split())
+
 
 def get_yes24_detail_page_url(book_name: str) -> Optional[str]:
     if not book_name:
         return
-    book_name = "".join(filter(lambda x: str.isalnum(x) or x == " ", book_name))
+    book_name = normalize_book_name(book_name)
+    if url := _detail_page_urls.get(book_name):
+        return url
+    if url := _get_yes24_detail_page_url(book_name):
+        _detail_page_urls.set(book_name, url)
+    return url
+
+
+def _get_yes24_detail_page_url(book_name: str) -> Optional[str]:
     book_name_encoded = parse.quote_plus(book_name, encoding="euc-kr")
-    url_main_page = "https://www.yes24.com"
     url = (
         f"https://www.yes24.com/searchcorner/Search?keywordAd=&keyword=&domain=BOOK&"
         f"qdomain=%c5%eb%c7%d5%b0%cb%bb%f6&query={book_name_encoded}"
     )
 
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, "html5lib")
+    return parse_search_page(http_cache.get(url))
+
+
+def parse_search_page(html: str, parser: Optional[HTMLParser] = None) -> Optional[str]:
+    """returns the detail page url of the first search result."""
+    url_main_page = "https://www.yes24.com"
+    soup = BeautifulSoup(html, parser or default_parser)
 
     tag_book = (
         "#yesSchList > li:nth-child(1) > div > "
@@ -51,8 +123,26 @@ class Yes24ScrapResult:
 
     @classmethod
     def scrap(cls, detail_page_url: str) -> Yes24ScrapResult:
-        response = requests.get(detail_page_url)
-        return cls(BeautifulSoup(response.text, "html5lib"))
+        if result := _scrap_results.get(detail_page_url):
+            return result
+        result = cls.parse(http_cache.get(detail_page_url))
+        _scrap_results.set(detail_page_url, result)
+        return result
+
+    @classmethod
+    def parse(cls, html: str, parser: Optional[HTMLParser] = None) -> Yes24ScrapResult:
+        return cls(BeautifulSoup(html, parser or default_parser))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "true_name": self.get_true_name(),
+            "sub_name": self.get_sub_name(),
+            "author": self.get_author(),
+            "publisher": self.get_publisher(),
+            "page_count": self.get_page_count(),
+            "cover_image_url": self.get_cover_image_url(),
+            "contents": self.get_contents(),
+        }
 
     def get_true_name(self) -> Optional[str]:
         tag_name = "#yDetailTopWrap > div.topColRgt > div.gd_infoTop > div > h2"
@@ -102,9 +192,12 @@ class Yes24ScrapResult:
             pass
 
     def get_page_count(self) -> Optional[int]:
+        # html5lib implies <tbody>, while the other parsers keep the source as is
         tag_page = (
             "#infoset_specific > div.infoSetCont_wrap > div > table > "
-            "tbody > tr:nth-child(2) > td"
+            "tbody > tr:nth-child(2) > td, "
+            "#infoset_specific > div.infoSetCont_wrap > div > table > "
+            "tr:nth-child(2) > td"
         )
         try:
             page_count_plus_etc = self.soup.select_one(tag_page).text
@@ -1,3 +1,4 @@
+from datetime import datetime
 from functools import cache
 from pathlib import Path
 from typing import Optional, cast, Iterator, Iterable
@@ -5,7 +6,7 @@ from typing import Optional, cast, Iterator, Iterable
 import tenacity
 from loguru import logger
 
-from app.action.__core__ import SequentialAction
+from app.action.__core__ import SequentialAction, ActionScope
 from app.my_block import (
     DatabaseEnum,
     schedule,
@@ -16,7 +17,8 @@ from app.my_block import (
     Datei,
     Weeki,
 )
-from app.service.backup_service import ResponseBackupService
+from app.service.backup_service import ResponseBackupService, Fingerprint
+from app.service.history_service import HistoryService
 from notion_df.contents import ParagraphBlockContents
 from notion_df.core.request_core import RequestError
 from notion_df.data import PageData
@@ -24,40 +26,46 @@ from notion_df.entity import Page, Database, Block
 from notion_df.property import (
     RelationProperty,
     PageProperties,
-    RelationDatabasePropertyValue,
-    DualRelationDatabasePropertyValue,
 )
 from notion_df.rich_text import PageMention, RichText
 
 
+def get_all_databases() -> set[tuple[Database, None]]:
+    return {(database_enum.entity, None) for database_enum in DatabaseEnum}
+
+
 class MigrationBackupSaveAction(SequentialAction):
     def __init__(self, backup_dir: Path):
         self.backup = ResponseBackupService(backup_dir)
+        self.history = HistoryService(backup_dir)
 
     def query(self) -> Iterable[Page]:
         return []
 
+    def get_scope(self) -> ActionScope:
+        # only the backup files are written
+        return ActionScope(reads=get_all_databases())
+
     def process_page(self, page: Page) -> None:
         # TODO: add database backup
         if not isinstance(page.parent, Database):
             return
-        for prop in page.properties:
-            if not isinstance(prop, RelationProperty):
-                continue
-            prop_value = page.properties[prop]
-            # TODO: resolve Notion 504 error
-            #  https://notiondevs.slack.com/archives/C01CZTMG85C/p1701409539104549
-            if prop_value.has_more:
-                try:
-                    page.retrieve_property_item(prop)
-                except tenacity.RetryError:
-                    logger.error(
-                        f"failed Page.retrieve_property_item({page}, prop={prop.name})"
-                    )
-                    raise RuntimeError(
-                        f"failed Page.retrieve_property_item({page}, prop={prop.name})"
-                    )
-        self.backup.write(page)
+        # the fingerprint is taken before complete_properties() modifies the raw data
+        fingerprint = Fingerprint.of(page.data.raw)
+        if self.backup.is_unchanged(page, fingerprint):
+            return
+        # TODO: resolve Notion 504 error
+        #  https://notiondevs.slack.com/archives/C01CZTMG85C/p1701409539104549
+        try:
+            page.complete_properties()
+        except tenacity.RetryError:
+            logger.error(f"failed Page.complete_properties({page})")
+            raise RuntimeError(f"failed Page.complete_properties({page})")
+        self.backup.write(page, fingerprint)
+        self.history.record(page.data.raw, datetime.now())
+
+    def finish(self) -> None:
+        self.backup.report()
 
 
 class MigrationBackupLoadAction(SequentialAction):
@@ -68,6 +76,10 @@ class MigrationBackupLoadAction(SequentialAction):
     def query(self) -> Iterable[Page]:
         return []
 
+    def get_scope(self) -> ActionScope:
+        # the relations are restored on any of the known databases
+        return ActionScope(reads=get_all_databases(), writes=get_all_databases())
+
     def process_page(self, end_page: Page) -> None:
         # this_page: the global page, directly under one of the global dbs
         this_page: Page = next(
@@ -99,20 +111,16 @@ class MigrationBackupLoadAction(SequentialAction):
             if not isinstance(this_prev_prop, RelationProperty):
                 continue
             for linked_page in cast(Iterable[Page], this_prev_prop_value):
-                linked_prev_data: Optional[PageData] = self.response_backup.read(
-                    linked_page
-                )
-                if not linked_prev_data:
+                # only the parent is needed, which is cheaper than the full PageData
+                linked_prev_summary = self.response_backup.read_summary(linked_page)
+                if not linked_prev_summary:
                     logger.info(f"\t{linked_page=}: No previous response backup")
                     continue
                 if linked_page.local_data:
                     linked_db = linked_page.parent
-                    if linked_prev_data:
-                        linked_prev_db = linked_prev_data.parent
-                    else:
-                        linked_prev_db = None
+                    linked_prev_db = linked_prev_summary.parent
                 else:
-                    linked_db = linked_prev_db = linked_prev_data.parent
+                    linked_db = linked_prev_db = linked_prev_summary.parent
                 candidate_props = self.get_candidate_props(this_db, linked_db)
                 if not candidate_props:
                     new_mention_page_list.append(linked_page)
@@ -182,33 +190,6 @@ class MigrationBackupLoadAction(SequentialAction):
                     )
                 this_page.update(this_new_properties)
                 logger.info(f"\tRETRY {this_page}: {this_new_properties}")
-            elif "relation.length should be ≤ `100`" in e.message:
-                excess_page_dict = {}
-                for prop in this_new_properties:
-                    prop: RelationProperty
-                    if len(this_new_properties[prop]) > 100:
-                        excess_page_dict[prop] = this_new_properties[prop][100:]
-                        this_new_properties[prop] = prop.page_value(
-                            this_new_properties[prop][:100]
-                        )
-                this_page.update(this_new_properties)
-                for prop, excess_pages in excess_page_dict.items():
-                    db_prop_value: RelationDatabasePropertyValue = cast(
-                        Database, this_page.parent
-                    ).properties[prop]
-                    if not isinstance(db_prop_value, DualRelationDatabasePropertyValue):
-                        raise e
-                    synced_prop = db_prop_value.synced_property
-                    for that_page in excess_pages:
-                        that_page.update(
-                            PageProperties(
-                                {
-                                    synced_prop: synced_prop.page_value(
-                                        that_page.properties[synced_prop] + [this_page]
-                                    )
-                                }
-                            )
-                        )
             else:
                 logger.error(f"\tFAILED {this_page}: {this_new_properties}")
                 raise e
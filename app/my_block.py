@@ -4,12 +4,14 @@ import datetime as dt
 import re
 from abc import ABCMeta
 from enum import Enum
+from functools import cache, cached_property
 from typing import Optional, ClassVar, NewType, Iterable, Any
 from uuid import UUID
 
 from typing_extensions import Self
 
 from app.emoji_code import EmojiCode
+from app.service.template_service import template_service
 from notion_df.core.entity_core import Entity
 from notion_df.core.misc import undefined
 from notion_df.core.uuid_parser import get_page_or_database_url
@@ -28,8 +30,6 @@ from notion_df.property import (
 )
 from notion_df.rich_text import RichText
 
-_entity_to_enum = {}
-
 
 class DatabaseEnum(Enum):
     journal_db = ("바탕", "2c5411ba6a0f43a0a8aa06295751e37a", EmojiCode.BLUE_CIRCLE)
@@ -46,52 +46,56 @@ class DatabaseEnum(Enum):
         ">GenAI",
         "16a93035080d4b93b9e4b3db1b52811d",
         "",
-        Page("383cfe576d684df3823cb1535bebfaf0"),
+        "383cfe576d684df3823cb1535bebfaf0",
     )
 
     def __init__(self, title: str, id_or_url: str, prefix: str, *args: Any) -> None:
         self._value_ = self._name_
         self.prefix = prefix
         self.title = title
-        if args:
-            parent = args[0]
+        self._id_or_url = id_or_url
+        self._parent_id_or_url: Optional[str] = args[0] if args else None
+
+    @cached_property
+    def entity(self) -> Database:
+        """resolved on first use, with the preview data."""
+        if self._parent_id_or_url:
+            parent = Page(self._parent_id_or_url)
         else:
             parent = Workspace()
-        self.entity = Database(id_or_url)
-        _entity_to_enum[self.entity] = self
+        entity = Database(self._id_or_url)
         DatabaseData(
-            id=self.entity.id,
+            id=entity.id,
             parent=parent,
             created_time=undefined,
             last_edited_time=undefined,
             icon=Emoji(self.prefix),
             cover=undefined,
-            url=get_page_or_database_url(id_or_url, "dyhn"),
+            url=get_page_or_database_url(self._id_or_url, "dyhn"),
             title=RichText.from_plain_text(self.title),
             properties=undefined,
             archived=False,
             is_inline=False,
         ).add_preview()
+        return entity
 
     @property
     def prefix_title(self) -> str:  # TODO: remove
+        # the live title once the database is retrieved, otherwise the preview data without a request
         return self.entity.icon.as_emoji_value() + self.entity.title.plain_text
 
     @classmethod
     def from_entity(cls, entity: Entity) -> Optional[DatabaseEnum]:
-        return _entity_to_enum.get(entity)
+        return _get_entity_to_enum().get(entity)
+
+
+@cache
+def _get_entity_to_enum() -> dict[Database, DatabaseEnum]:
+    return {database_enum.entity: database_enum for database_enum in DatabaseEnum}
 
 
 def is_template(page: Page) -> bool:
-    database = page.data.parent
-    if not database or not isinstance(database, Database):
-        return False
-    return bool(
-        re.match(
-            f"<{database.data.title.plain_text}>.*",
-            page.data.properties.title.plain_text,
-        )
-    )
+    return template_service.is_template(page)
 
 
 korean_weekday = "월화수목금토일"
@@ -140,7 +144,9 @@ class TitleIndexedPage(Page, metaclass=ABCMeta):
     def get_by_title(cls, title_plain_text: str) -> Optional[Self]:
         if page := cls.pages_by_title_plain_text.get(title_plain_text):
             return page
-        plain_page_list = cls.db.query(cls.title_prop.filter.equals(title_plain_text))
+        plain_page_list = cls.db.query(
+            cls.title_prop.filter.equals(title_plain_text), limit=1
+        )
         if not plain_page_list:
             return None
         page = cls(plain_page_list[0].id)
@@ -173,7 +179,9 @@ class Datei(TitleIndexedPage):
 
     @classmethod
     def get_or_create(cls, date: dt.date) -> Datei:
-        if page_list := cls.db.query(cls.date_prop.filter.equals(date)):
+        if page := cls.page_by_date_dict.get(date):
+            return page
+        if page_list := cls.db.query(cls.date_prop.filter.equals(date), limit=1):
             return cls(page_list[0].id)
         return cls.create(date)
 
@@ -1,14 +1,20 @@
 # TODO: use supervisord. https://chatgpt.com/c/6797165b-942c-8004-95b2-bd91c66157c1
+from __future__ import annotations
+
 import os
-import subprocess
 import sys
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
-from time import sleep
+from typing import Callable, Optional, TYPE_CHECKING
 
-import psutil
+from loguru import logger
 
-import app.routine.task
 from app import project_dir
+from notion_df.core.data_core import real_data_dict
+
+if TYPE_CHECKING:
+    from app.action.__core__ import Action
 
 
 def get_module_name(file_path: str) -> str:
@@ -18,26 +24,100 @@ def get_module_name(file_path: str) -> str:
 
 
 main_module_argv = [sys.executable, "-m", get_module_name(__file__)]
-task_module_argv = [sys.executable, "-m", get_module_name(app.routine.task.__file__)]
+
+
+class AdaptiveInterval:
+    """the sleep interval between the cycles.
+    shrinks to the minimum when a cycle found edits, and grows while idle."""
+
+    def __init__(
+        self,
+        min_interval: timedelta = timedelta(seconds=5),
+        max_interval: timedelta = timedelta(minutes=5),
+        failure_interval: timedelta = timedelta(minutes=10),
+        growth_factor: float = 2,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.failure_interval = failure_interval
+        self.growth_factor = growth_factor
+        self.interval = min_interval
+
+    def on_busy(self) -> timedelta:
+        self.interval = self.min_interval
+        return self.interval
+
+    def on_idle(self) -> timedelta:
+        self.interval = min(self.max_interval, self.interval * self.growth_factor)
+        return self.interval
+
+    def on_failure(self) -> timedelta:
+        # keep the idle interval, so that the next success does not start from the minimum
+        return self.failure_interval
+
+
+class RoutineScheduler:
+    """runs the routine action in-process, so that the HTTP connections and
+    the entity caches stay warm between the cycles."""
+
+    def __init__(
+        self,
+        interval: AdaptiveInterval,
+        cache_lifetime: timedelta = timedelta(hours=6),
+        *,
+        action: Optional[Action] = None,
+        clock: Callable[[], datetime] = datetime.now,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if action is None:
+            from app.action.__routine__ import routine_action
+
+            action = routine_action
+        self.interval = interval
+        self.cache_lifetime = cache_lifetime
+        self.action = action
+        self.clock = clock
+        self.sleep = sleep
+        self.cache_created_time = clock()
+
+    def run_cycle(self) -> timedelta:
+        if self.clock() - self.cache_created_time > self.cache_lifetime:
+            logger.info("clear the entity cache")
+            real_data_dict.clear()
+            self.cache_created_time = self.clock()
+        try:
+            result = self.action.run_from_last_success(update_last_success_time=True)
+        except Exception as e:
+            # entrypoint() already logged the traceback
+            logger.error(f"cycle failed: {type(e).__name__}: {e}")
+            return self.interval.on_failure()
+        # None if skipped, that is, no new record found
+        if result is None:
+            return self.interval.on_idle()
+        return self.interval.on_busy()
+
+    def run_forever(self) -> None:
+        while True:
+            interval = self.run_cycle()
+            logger.info(f"next cycle after {interval}")
+            self.sleep(interval.total_seconds())
+
 
 if __name__ == "__main__":
+    import psutil
+
     for process in psutil.process_iter(["name", "cmdline"]):
         try:
+            if process.pid == os.getpid():
+                continue
             command = " ".join(process.cmdline())
-            if " ".join(task_module_argv) in command:
+            if " ".join(main_module_argv[1:]) in command:
                 sys.stderr.write(
-                    f"Aborting: task module is already running on another process."
+                    f"Aborting: main module is already running on another process."
                     f" {command=}\n"
                 )
                 sys.exit(1)
         except (psutil.AccessDenied, psutil.NoSuchProcess):
             continue
 
-    proc = subprocess.run(
-        task_module_argv, env={**os.environ}, cwd=project_dir, check=False
-    )
-    if proc.returncode != 0:
-        sleep(600)
-    else:
-        sleep(5)
-    os.execv(sys.executable, main_module_argv)
+    RoutineScheduler(AdaptiveInterval()).run_forever()
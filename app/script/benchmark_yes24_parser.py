@@ -0,0 +1,96 @@
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, get_args
+
+from app import cache_dir, project_dir
+from app.action.media_scrap.yes24_scraper import (
+    HTMLParser,
+    Yes24ScrapResult,
+    parse_search_page,
+)
+
+reference_parser: HTMLParser = "html5lib"
+"""the most lenient parser, which the others should agree with."""
+fixture_dir = (
+    project_dir / "test" / "app" / "action" / "media_scraper" / "yes24_fixtures"
+)
+"""the real yes24 pages, copied from the HTTP cache by save_fixtures()."""
+
+
+def get_available_parsers() -> list[HTMLParser]:
+    from bs4 import BeautifulSoup, FeatureNotFound
+
+    parsers = []
+    for parser in get_args(HTMLParser):
+        try:
+            BeautifulSoup("", parser)
+        except FeatureNotFound:
+            continue
+        parsers.append(parser)
+    return parsers
+
+
+def load_fixtures(root: Path) -> list[tuple[str, str]]:
+    """the (url, html) of the yes24 pages saved by the HTTP cache."""
+    fixtures = []
+    for path in sorted(root.glob("*.json")):
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        fixtures.append((raw["url"], raw["text"]))
+    return fixtures
+
+
+def save_fixtures(root: Optional[Path] = None) -> int:
+    """copy the yes24 pages in the HTTP cache to the fixture directory, to commit them.
+    returns the number of the copied pages."""
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    paths = sorted((root or cache_dir / "yes24").glob("*.json"))
+    for path in paths:
+        shutil.copyfile(path, fixture_dir / path.name)
+    return len(paths)
+
+
+def get_extractor(url: str) -> Callable[[str, HTMLParser], Any]:
+    if "/searchcorner/" in url:
+        return parse_search_page
+    return lambda html, parser: Yes24ScrapResult.parse(html, parser).to_dict()
+
+
+def benchmark_yes24_parser(root: Optional[Path] = None) -> bool:
+    """print the mean parse time of each parser, and the pages of different output.
+    returns whether every parser agrees with the reference parser."""
+    fixtures = load_fixtures(root or fixture_dir)
+    if not fixtures:
+        print(
+            "no fixture found. run MediaScrapAction to fill the cache,"
+            " then run this script with --save-fixtures."
+        )
+        return True
+    parsers = get_available_parsers()
+    elapsed_times = {parser: 0.0 for parser in parsers}
+    consistent = True
+    for url, html in fixtures:
+        extract = get_extractor(url)
+        outputs = {}
+        for parser in parsers:
+            start_time = time.perf_counter()
+            outputs[parser] = extract(html, parser)
+            elapsed_times[parser] += time.perf_counter() - start_time
+        for parser, output in outputs.items():
+            if output != outputs[reference_parser]:
+                consistent = False
+                print(
+                    f"MISMATCH {parser}: {url}\n\t{output}\n\t{outputs[reference_parser]}"
+                )
+    print(f"{len(fixtures)} pages")
+    for parser, elapsed_time in elapsed_times.items():
+        print(f"{parser:>12}: {elapsed_time / len(fixtures) * 1000:8.1f} ms/page")
+    return consistent
+
+
+if __name__ == "__main__":
+    if "--save-fixtures" in sys.argv[1:]:
+        print(f"{save_fixtures()} pages saved to {fixture_dir}")
+    sys.exit(0 if benchmark_yes24_parser() else 1)
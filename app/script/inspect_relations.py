@@ -22,6 +22,7 @@ def init():
 
                 linked_db = cast(prop.database_value, db.data.properties[prop]).database
                 _all_relation_properties[(db, linked_db)].append(prop)
+    pickle_path.parent.mkdir(parents=True, exist_ok=True)
     pickle.dump(_all_relation_properties, pickle_path.open("wb"))
 
 
@@ -0,0 +1,61 @@
+import re
+import subprocess
+import sys
+
+from app import project_dir
+
+module_budgets_ms = {
+    "notion_df.entity": 60,
+    "notion_df.data": 120,
+    "app.my_block": 200,
+    "app.action.__core__": 200,
+    "app.action.__routine__": 200,
+}
+"""the startup-time budget of the entry modules, measured on a cold process."""
+_import_time_pattern = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s+(\S+)$")
+
+
+def _run_importtime(module: str) -> dict[str, int]:
+    """returns the cumulative import time of each imported module, in microseconds."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    cumulative_times: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if match := _import_time_pattern.match(line):
+            cumulative_times[match.group(2)] = int(match.group(1))
+    return cumulative_times
+
+
+def measure_import_time(module: str, top: int = 5, repeat: int = 5) -> float:
+    """print the cumulative import time of the module and its slowest dependencies,
+    from the fastest of the repeated runs.
+    returns the cumulative import time in milliseconds."""
+    cumulative_times = min(
+        (_run_importtime(module) for _ in range(repeat)),
+        key=lambda times: times.get(module, 0),
+    )
+    import_time_ms = cumulative_times.get(module, 0) / 1000
+    print(f"{module}: {import_time_ms:.1f} ms")
+    slowest = sorted(
+        (item for item in cumulative_times.items() if item[0] not in (module, "site")),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    for name, microseconds in slowest[:top]:
+        print(f"    {name}: {microseconds / 1000:.1f} ms")
+    return import_time_ms
+
+
+if __name__ == "__main__":
+    over_budget_modules = []
+    for _module, _budget_ms in module_budgets_ms.items():
+        if measure_import_time(_module) > _budget_ms:
+            over_budget_modules.append(_module)
+    if over_budget_modules:
+        print(f"over the budget: {over_budget_modules}")
+        sys.exit(1)
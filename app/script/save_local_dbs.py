@@ -13,4 +13,6 @@ if __name__ == "__main__":
         if DatabaseEnum.from_entity(db) is None
     ]
     print("#### [", *local_db_list, "] ####", sep="\n")
-    action.process_pages(chain.from_iterable(db.query() for db in local_db_list))
+    action.process_pages(
+        chain.from_iterable(db.query().stream() for db in local_db_list)
+    )
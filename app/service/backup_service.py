@@ -1,26 +1,82 @@
+from __future__ import annotations
+
+import hashlib
 import json
+import sqlite3
+import threading
+import zlib
+from abc import ABCMeta, abstractmethod
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Any, Union, Callable
+from uuid import UUID
 
 from loguru import logger
 
 from notion_df.core.data_core import EntityDataT
 from notion_df.core.entity_core import Entity
 from notion_df.core.serialization import SerializationError
+from notion_df.entity import Block, Database, Page, Workspace
+from notion_df.misc import PartialParent
 
 
-class ResponseBackupService:
-    def __init__(self, root: Path):
-        self.root = root
+@dataclass(frozen=True)
+class Fingerprint:
+    last_edited_time: str
+    digest: str
+    """the hash of the raw data. it catches the edits within the same minute,
+    since last_edited_time is rounded to minutes."""
 
-    def _get_path(self, entity: Entity) -> Path:
-        return self.root / f"{str(entity.id).replace('-', '')}.json"
+    @classmethod
+    def of(cls, raw_data: dict[str, Any]) -> Fingerprint:
+        serialized = json.dumps(raw_data, sort_keys=True, separators=(",", ":"))
+        return cls(
+            raw_data.get("last_edited_time", ""),
+            hashlib.blake2b(serialized.encode(), digest_size=16).hexdigest(),
+        )
+
+
+@dataclass(frozen=True)
+class BackupSummary:
+    """the parent and the relation ids of the backup, without deserializing the whole data."""
+
+    parent: Union[Block, Database, Page, Workspace]
+    relation_ids: dict[str, list[UUID]]
+    """property name -> the related page ids."""
+
+    @classmethod
+    def of(cls, raw_data: dict[str, Any]) -> BackupSummary:
+        relation_ids = {
+            prop_name: [UUID(relation["id"]) for relation in raw_prop["relation"]]
+            for prop_name, raw_prop in raw_data.get("properties", {}).items()
+            if raw_prop.get("type") == "relation"
+        }
+        return cls(PartialParent.deserialize(raw_data["parent"]).resolved, relation_ids)
+
+
+class BaseBackupService(metaclass=ABCMeta):
+    def __init__(self, cache_size: int = 1024):
+        self.counter: Counter[str] = Counter()
+        """the number of created, overwritten and unchanged entities."""
+        self._counter_lock = threading.Lock()
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple[str, str], tuple[Any, Any]] = OrderedDict()
+        """(kind, key) -> (the stored version, the read result including None).
+        invalidated on write, or when another instance changed the stored version."""
+        self._cache_lock = threading.Lock()
 
     def read(self, entity: Entity[EntityDataT]) -> Optional[EntityDataT]:
-        path = self._get_path(entity)
-        if not path.is_file():
+        return self._read_cached("data", entity, self._read_data)
+
+    def read_summary(self, entity: Entity) -> Optional[BackupSummary]:
+        """the lazy version of read(), when only the parent or the relation ids are needed."""
+        return self._read_cached("summary", entity, self._read_summary)
+
+    def _read_data(self, entity: Entity[EntityDataT]) -> Optional[EntityDataT]:
+        response_raw_data = self._read_raw(entity)
+        if response_raw_data is None:
             return None
-        response_raw_data = json.loads(path.read_text())
         response_cls = entity.get_data_cls()
         try:
             return response_cls.deserialize(response_raw_data)
@@ -29,14 +85,282 @@ class ResponseBackupService:
                 f"Skip invalid response_raw_data: entity - {entity}, response_raw_data - {response_raw_data}"
             )
 
-    def write(self, entity: Entity[EntityDataT]) -> None:
-        path = self._get_path(entity)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        if path.is_file():
+    def _read_summary(self, entity: Entity) -> Optional[BackupSummary]:
+        response_raw_data = self._read_raw(entity)
+        if response_raw_data is None:
+            return None
+        try:
+            return BackupSummary.of(response_raw_data)
+        except (KeyError, TypeError, ValueError):
+            logger.warning(
+                f"Skip invalid response_raw_data: entity - {entity}, response_raw_data - {response_raw_data}"
+            )
+
+    def _read_cached(
+        self, kind: str, entity: Entity, read: Callable[[Entity], Any]
+    ) -> Any:
+        cache_key = kind, self._get_key(entity)
+        # taken before the read, so that a concurrent write makes the next read miss
+        version = self._get_version(entity)
+        with self._cache_lock:
+            if (cached := self._cache.get(cache_key)) and cached[0] == version:
+                self._cache.move_to_end(cache_key)
+                return cached[1]
+        value = read(entity)
+        with self._cache_lock:
+            self._cache[cache_key] = version, value
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def _invalidate(self, entity: Entity) -> None:
+        key = self._get_key(entity)
+        with self._cache_lock:
+            self._cache.pop(("data", key), None)
+            self._cache.pop(("summary", key), None)
+
+    def write(
+        self, entity: Entity[EntityDataT], fingerprint: Optional[Fingerprint] = None
+    ) -> None:
+        """the fingerprint should be taken before the local data is modified (ex: Page.complete_properties()).
+        if None, it is taken from the current data."""
+        raw_data = entity.data.raw
+        assert raw_data is not None
+        if fingerprint is None:
+            fingerprint = Fingerprint.of(raw_data)
+        if self.is_unchanged(entity, fingerprint):
+            return
+        self._invalidate(entity)
+        if self._write_raw(entity, raw_data):
             logger.info(f"\t{entity}\n\t\t-> overwrite")
+            self._count("overwritten")
         else:
             logger.info(f"\t{entity}\n\t\t-> create")
+            self._count("created")
+        self._write_fingerprint(entity, fingerprint)
+
+    def is_unchanged(self, entity: Entity, fingerprint: Fingerprint) -> bool:
+        """whether the entity is backed up with the same fingerprint. counted if so."""
+        if self._read_fingerprint(entity) != fingerprint:
+            return False
+        logger.debug(f"\t{entity}\n\t\t-> unchanged")
+        self._count("unchanged")
+        return True
+
+    def report(self) -> None:
+        logger.info(f"{type(self).__name__}: {dict(self.counter)}")
+
+    def _count(self, key: str) -> None:
+        with self._counter_lock:
+            self.counter[key] += 1
+
+    @abstractmethod
+    def _read_raw(self, entity: Entity) -> Optional[dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def _write_raw(self, entity: Entity, raw_data: dict[str, Any]) -> bool:
+        """returns whether it overwrote the previous data."""
+        pass
+
+    @abstractmethod
+    def _get_version(self, entity: Entity) -> Any:
+        """a cheap value which changes whenever the stored data changes, even by another instance."""
+        pass
+
+    @abstractmethod
+    def _read_fingerprint(self, entity: Entity) -> Optional[Fingerprint]:
+        pass
+
+    @abstractmethod
+    def _write_fingerprint(self, entity: Entity, fingerprint: Fingerprint) -> None:
+        pass
+
+    @staticmethod
+    def _get_key(entity: Entity) -> str:
+        return str(entity.id).replace("-", "")
+
+
+class ResponseBackupService(BaseBackupService):
+    """one JSON file per entity.
+    the fingerprints are appended to a log file, which is loaded on first use."""
+
+    fingerprint_file_name = "fingerprints.jsonl"
+
+    def __init__(self, root: Path, cache_size: int = 1024):
+        super().__init__(cache_size)
+        self.root = root
+        self._fingerprints: Optional[dict[str, Fingerprint]] = None
+        self._fingerprint_lock = threading.Lock()
+
+    def _get_path(self, entity: Entity) -> Path:
+        return self.root / f"{self._get_key(entity)}.json"
+
+    def _get_version(self, entity: Entity) -> Optional[tuple[int, int]]:
+        try:
+            stat = self._get_path(entity).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_raw(self, entity: Entity) -> Optional[dict[str, Any]]:
+        path = self._get_path(entity)
+        if not path.is_file():
+            return None
+        return json.loads(path.read_text())
+
+    def _write_raw(self, entity: Entity, raw_data: dict[str, Any]) -> bool:
+        path = self._get_path(entity)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        overwrite = path.is_file()
         with path.open("w") as file:
-            raw_data = entity.data.raw
-            assert raw_data is not None
             json.dump(raw_data, file, indent=2)
+        return overwrite
+
+    def _load_fingerprints(self) -> dict[str, Fingerprint]:
+        """should be called with the lock."""
+        if self._fingerprints is None:
+            self._fingerprints = {}
+            path = self.root / self.fingerprint_file_name
+            if path.is_file():
+                with path.open() as file:
+                    for line in file:
+                        key, last_edited_time, digest = json.loads(line)
+                        self._fingerprints[key] = Fingerprint(last_edited_time, digest)
+        return self._fingerprints
+
+    def _read_fingerprint(self, entity: Entity) -> Optional[Fingerprint]:
+        with self._fingerprint_lock:
+            return self._load_fingerprints().get(self._get_key(entity))
+
+    def _write_fingerprint(self, entity: Entity, fingerprint: Fingerprint) -> None:
+        key = self._get_key(entity)
+        with self._fingerprint_lock:
+            self._load_fingerprints()[key] = fingerprint
+            with (self.root / self.fingerprint_file_name).open("a") as file:
+                file.write(
+                    json.dumps([key, fingerprint.last_edited_time, fingerprint.digest])
+                    + "\n"
+                )
+
+
+class SQLiteBackupService(BaseBackupService):
+    """a single SQLite file indexed by the entity id, with compact and optionally compressed JSON.
+    drop-in replacement of ResponseBackupService, given the same root directory."""
+
+    file_name = "backup.sqlite3"
+
+    def __init__(self, root: Path, compress: bool = True, cache_size: int = 1024):
+        super().__init__(cache_size)
+        self.root = root
+        self.compress = compress
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self.root / self.file_name
+
+    def _connect(self) -> sqlite3.Connection:
+        """should be called with the lock."""
+        if self._connection is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            # the connection is shared between the threads, under the lock
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL lets the readers and the writer of the other instances work together
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS response"
+                " (id TEXT PRIMARY KEY, compressed INTEGER NOT NULL, data BLOB NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprint"
+                " (id TEXT PRIMARY KEY, last_edited_time TEXT NOT NULL, digest TEXT NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _get_version(self, entity: Entity) -> Optional[tuple[int, Optional[str]]]:
+        # write() stores the new fingerprint along with the data
+        with self._lock:
+            return (
+                self._connect()
+                .execute(
+                    "SELECT length(response.data), fingerprint.digest FROM response"
+                    " LEFT JOIN fingerprint ON fingerprint.id = response.id"
+                    " WHERE response.id = ?",
+                    (self._get_key(entity),),
+                )
+                .fetchone()
+            )
+
+    def _read_raw(self, entity: Entity) -> Optional[dict[str, Any]]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT compressed, data FROM response WHERE id = ?",
+                    (self._get_key(entity),),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        compressed, data = row
+        if compressed:
+            data = zlib.decompress(data)
+        return json.loads(data)
+
+    def _write_raw(self, entity: Entity, raw_data: dict[str, Any]) -> bool:
+        data = json.dumps(raw_data, ensure_ascii=False, separators=(",", ":")).encode()
+        if self.compress:
+            data = zlib.compress(data)
+        key = self._get_key(entity)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                overwrite = (
+                    connection.execute(
+                        "SELECT 1 FROM response WHERE id = ?", (key,)
+                    ).fetchone()
+                    is not None
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO response (id, compressed, data) VALUES (?, ?, ?)",
+                    (key, int(self.compress), data),
+                )
+        return overwrite
+
+    def _read_fingerprint(self, entity: Entity) -> Optional[Fingerprint]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT last_edited_time, digest FROM fingerprint WHERE id = ?",
+                    (self._get_key(entity),),
+                )
+                .fetchone()
+            )
+        return Fingerprint(*row) if row else None
+
+    def _write_fingerprint(self, entity: Entity, fingerprint: Fingerprint) -> None:
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO fingerprint (id, last_edited_time, digest)"
+                    " VALUES (?, ?, ?)",
+                    (
+                        self._get_key(entity),
+                        fingerprint.last_edited_time,
+                        fingerprint.digest,
+                    ),
+                )
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from loguru import logger
+
+from notion_df.core.metrics import ContextThreadPoolExecutor
+from notion_df.core.request_core import MAX_PAGE_SIZE
+from notion_df.entity import Database, Page, Workspace
+from notion_df.filter import last_edited_time_filter
+
+
+class ChangeDetectionService:
+    """find the pages edited in the given time range.
+
+    each known database is queried concurrently with `last_edited_time` filter.
+    if `search_outside`, the pages outside the known databases are also found by the workspace search,
+    which pages through every page edited since `lower_bound`, so it is disabled by default."""
+
+    def __init__(
+        self,
+        databases: Iterable[Database],
+        *,
+        search_outside: bool = False,
+        max_workers: int = 4,
+    ):
+        self.databases = list(databases)
+        self.search_outside = search_outside
+        self.max_workers = max_workers
+
+    def find(
+        self, lower_bound: datetime, upper_bound: Optional[datetime] = None
+    ) -> set[Page]:
+        with ContextThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=type(self).__name__
+        ) as executor:
+            futures = [
+                executor.submit(self._query, database, lower_bound, upper_bound)
+                for database in self.databases
+            ]
+            if self.search_outside:
+                futures.append(executor.submit(self._search, lower_bound, upper_bound))
+            pages = set()
+            for future in futures:
+                pages.update(future.result())
+        return pages
+
+    @staticmethod
+    def _query(
+        database: Database, lower_bound: datetime, upper_bound: Optional[datetime]
+    ) -> list[Page]:
+        filter_ = last_edited_time_filter.on_or_after(lower_bound)
+        if upper_bound is not None:
+            filter_ &= last_edited_time_filter.on_or_before(upper_bound)
+        pages = list(database.query(filter_, page_size=MAX_PAGE_SIZE))
+        logger.debug(f"{database} : {len(pages)} pages")
+        return pages
+
+    def _search(
+        self, lower_bound: datetime, upper_bound: Optional[datetime]
+    ) -> list[Page]:
+        # the search result is ordered by last_edited_time, but only minute-precise
+        pages = []
+        for page in Workspace().search_by_title("", "page", page_size=MAX_PAGE_SIZE):
+            if upper_bound is not None and page.last_edited_time > upper_bound:
+                continue
+            if page.last_edited_time < lower_bound:
+                break
+            if page.parent not in self.databases:
+                pages.append(page)
+        return pages
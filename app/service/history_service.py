@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional, Union
+from uuid import UUID
+
+from loguru import logger
+
+_nested_keys = ("properties",)
+"""the keys of which the delta is taken per item, instead of the whole value."""
+
+
+def get_delta(
+    old: dict[str, Any],
+    new: dict[str, Any],
+    nested_keys: tuple[str, ...] = _nested_keys,
+) -> dict[str, Any]:
+    """the changes from `old` to `new`. empty if nothing changed."""
+    delta: dict[str, Any] = {}
+    changed = {
+        key: value
+        for key, value in new.items()
+        if key not in nested_keys and (key not in old or old[key] != value)
+    }
+    removed = [key for key in old if key not in nested_keys and key not in new]
+    if changed:
+        delta["set"] = changed
+    if removed:
+        delta["unset"] = removed
+    for nested_key in nested_keys:
+        nested_delta = get_delta(old.get(nested_key, {}), new.get(nested_key, {}), ())
+        if nested_delta:
+            delta[nested_key] = nested_delta
+    return delta
+
+
+def apply_delta(
+    old: dict[str, Any],
+    delta: dict[str, Any],
+    nested_keys: tuple[str, ...] = _nested_keys,
+) -> dict[str, Any]:
+    new = {
+        key: value for key, value in old.items() if key not in delta.get("unset", [])
+    }
+    new.update(delta.get("set", {}))
+    for nested_key in nested_keys:
+        if nested_key in delta:
+            new[nested_key] = apply_delta(
+                new.get(nested_key, {}), delta[nested_key], ()
+            )
+    return new
+
+
+class HistoryService:
+    """the history of the raw responses, to restore any page or database as of a given time.
+
+    each revision is either a full base or a delta from the previous revision, with the property level granularity.
+    a new base is stored when the latest one is older than `base_interval`,
+    so that a restore applies a bounded number of deltas."""
+
+    file_name = "history.sqlite3"
+
+    def __init__(self, root: Path, base_interval: timedelta = timedelta(days=30)):
+        self.root = root
+        self.base_interval = base_interval
+        self._base_interval_ms = int(base_interval.total_seconds() * 1000)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self.root / self.file_name
+
+    def _connect(self) -> sqlite3.Connection:
+        """should be called with the lock."""
+        if self._connection is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS revision"
+                " (id TEXT NOT NULL, time INTEGER NOT NULL, is_base INTEGER NOT NULL,"
+                " database_id TEXT, data BLOB NOT NULL, PRIMARY KEY (id, time))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS revision_database_id"
+                " ON revision (database_id, time)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def record(self, raw_data: dict[str, Any], time: datetime) -> bool:
+        """returns whether a new revision is stored.
+        the revisions of the same entity should be recorded in chronological order."""
+        entity_id = self._get_key(raw_data["id"])
+        timestamp = self._get_timestamp(time)
+        with self._lock:
+            connection = self._connect()
+            revisions = self._get_revisions(connection, entity_id, timestamp)
+            if revisions:
+                base_timestamp = revisions[0][0]
+                latest = self._build(revisions)
+                delta = get_delta(latest, raw_data)
+                if not delta:
+                    return False
+                if timestamp - base_timestamp < self._base_interval_ms:
+                    is_base, value = False, delta
+                else:
+                    is_base, value = True, raw_data
+            else:
+                is_base, value = True, raw_data
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO revision (id, time, is_base, database_id, data)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (
+                        entity_id,
+                        timestamp,
+                        int(is_base),
+                        self._get_database_id(raw_data),
+                        self._compress(value),
+                    ),
+                )
+        logger.debug(f"{entity_id} -> {'base' if is_base else 'delta'}")
+        return True
+
+    def restore(
+        self, entity_id: Union[UUID, str], time: datetime
+    ) -> Optional[dict[str, Any]]:
+        """the raw data as of the given time. None if not recorded yet."""
+        with self._lock:
+            revisions = self._get_revisions(
+                self._connect(), self._get_key(entity_id), self._get_timestamp(time)
+            )
+        if not revisions:
+            return None
+        return self._build(revisions)
+
+    def restore_database(
+        self, database_id: Union[UUID, str], time: datetime
+    ) -> dict[UUID, dict[str, Any]]:
+        """the raw data of the pages in the database as of the given time, excluding the archived ones."""
+        database_key = self._get_key(database_id)
+        timestamp = self._get_timestamp(time)
+        with self._lock:
+            # every page which has been in the database, some of which may have moved out
+            entity_ids = [
+                row[0]
+                for row in self._connect().execute(
+                    "SELECT DISTINCT id FROM revision WHERE database_id = ? AND time <= ?",
+                    (database_key, timestamp),
+                )
+            ]
+        pages = {}
+        for entity_id in entity_ids:
+            raw_data = self.restore(entity_id, time)
+            if (
+                raw_data is None
+                or self._get_database_id(raw_data) != database_key
+                or raw_data.get("archived")
+                or raw_data.get("in_trash")
+            ):
+                continue
+            pages[UUID(entity_id)] = raw_data
+        return pages
+
+    def _get_revisions(
+        self, connection: sqlite3.Connection, entity_id: str, timestamp: int
+    ) -> list[tuple[int, bool, dict[str, Any]]]:
+        """the latest base and the following deltas, until the given timestamp."""
+        rows = connection.execute(
+            "SELECT time, is_base, data FROM revision WHERE id = ? AND time <= ?"
+            " AND time >= (SELECT max(time) FROM revision"
+            " WHERE id = ? AND time <= ? AND is_base = 1)"
+            " ORDER BY time",
+            (entity_id, timestamp, entity_id, timestamp),
+        ).fetchall()
+        return [
+            (time, bool(is_base), self._decompress(data))
+            for time, is_base, data in rows
+        ]
+
+    @staticmethod
+    def _build(revisions: list[tuple[int, bool, dict[str, Any]]]) -> dict[str, Any]:
+        _, is_base, raw_data = revisions[0]
+        assert is_base
+        for _, _, delta in revisions[1:]:
+            raw_data = apply_delta(raw_data, delta)
+        return raw_data
+
+    @staticmethod
+    def _compress(value: dict[str, Any]) -> bytes:
+        return zlib.compress(
+            json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+        )
+
+    @staticmethod
+    def _decompress(data: bytes) -> dict[str, Any]:
+        return json.loads(zlib.decompress(data))
+
+    @staticmethod
+    def _get_key(entity_id: Union[UUID, str]) -> str:
+        return str(entity_id).replace("-", "")
+
+    @classmethod
+    def _get_database_id(cls, raw_data: dict[str, Any]) -> Optional[str]:
+        database_id = raw_data.get("parent", {}).get("database_id")
+        return cls._get_key(database_id) if database_id else None
+
+    @staticmethod
+    def _get_timestamp(time: datetime) -> int:
+        """in milliseconds. naive datetimes are regarded as the local time."""
+        return int(time.timestamp() * 1000)
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, asdict
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional, Any, TYPE_CHECKING
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    import requests
+
+
+class CacheMissError(Exception):
+    """the response is not cached, while the network is not allowed."""
+
+    pass
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    text: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def has_validator(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class HTTPCacheService:
+    """a disk cache of the GET responses, one JSON file per URL.
+
+    the response with ETag or Last-Modified is revalidated with a conditional request on every use,
+    which returns 304 without the body if unchanged. the others are reused until `ttl` passes.
+    if `offline`, every response is served from the cache without the network."""
+
+    def __init__(
+        self,
+        root: Path,
+        ttl: timedelta = timedelta(days=7),
+        *,
+        timeout: float = 10,
+        offline: bool = False,
+        session: Optional[requests.Session] = None,
+    ):
+        self.root = root
+        self.ttl = ttl
+        self.timeout = timeout
+        self.offline = offline
+        self._session = session
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """created on first use, since requests is slow to import."""
+        with self._session_lock:
+            if self._session is None:
+                import requests.adapters
+
+                self._session = requests.Session()
+                self._session.mount(
+                    "https://", requests.adapters.HTTPAdapter(pool_maxsize=8)
+                )
+            return self._session
+
+    def get(self, url: str) -> str:
+        """the response text of the URL."""
+        cached = self._load(url)
+        if self.offline:
+            if cached is None:
+                raise CacheMissError(url)
+            return cached.text
+        if (
+            cached is not None
+            and not cached.has_validator
+            and time.time() - cached.fetched_at < self.ttl.total_seconds()
+        ):
+            return cached.text
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if cached is not None and response.status_code == 304:
+            logger.trace(f"not modified: {url}")
+            cached.fetched_at = time.time()
+            self._save(cached)
+            return cached.text
+        if response.ok:
+            self._save(
+                CachedResponse(
+                    url,
+                    response.text,
+                    time.time(),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
+            )
+        return response.text
+
+    def _get_path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def _load(self, url: str) -> Optional[CachedResponse]:
+        path = self._get_path(url)
+        if not path.is_file():
+            return None
+        raw: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        return CachedResponse(**raw)
+
+    def _save(self, cached: CachedResponse) -> None:
+        path = self._get_path(cached.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # written to a temporary file first, so that a concurrent reader never sees a partial file
+        temp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        temp_path.write_text(
+            json.dumps(asdict(cached), ensure_ascii=False), encoding="utf-8"
+        )
+        temp_path.replace(path)
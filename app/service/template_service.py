@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import re
+import threading
+from typing import Iterable, Iterator, Optional
+
+from loguru import logger
+
+from notion_df.core.metrics import ContextThreadPoolExecutor
+from notion_df.entity import Database, Page
+
+
+class TemplateService:
+    """detect the template pages, whose title starts with `<database title>`.
+
+    the patterns are compiled once per database title, from the already loaded data.
+    a database without any local data is retrieved once, on its first page."""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._pattern_by_title: dict[str, re.Pattern[str]] = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, databases: Iterable[Database]) -> None:
+        """retrieve the databases without local data, concurrently."""
+        databases = [database for database in databases if not database.local_data]
+        if not databases:
+            return
+        logger.info(f"{type(self).__name__}.prefetch({databases})")
+        with ContextThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=type(self).__name__
+        ) as executor:
+            list(executor.map(Database.retrieve, databases))
+
+    def get_pattern(self, database: Database) -> re.Pattern[str]:
+        # Database.data retrieves only if there is no local data
+        title_plain_text = database.data.title.plain_text
+        with self._lock:
+            if (pattern := self._pattern_by_title.get(title_plain_text)) is None:
+                pattern = re.compile(re.escape(f"<{title_plain_text}>"))
+                self._pattern_by_title[title_plain_text] = pattern
+        return pattern
+
+    def is_template(self, page: Page) -> bool:
+        database = self._get_parent_database(page)
+        if database is None:
+            return False
+        return bool(
+            self.get_pattern(database).match(page.data.properties.title.plain_text)
+        )
+
+    def filter(self, pages: Iterable[Page]) -> Iterator[Page]:
+        """yield the pages which are not templates."""
+        for page in pages:
+            if not self.is_template(page):
+                yield page
+
+    @staticmethod
+    def _get_parent_database(page: Page) -> Optional[Database]:
+        database = page.data.parent
+        if not database or not isinstance(database, Database):
+            return None
+        return database
+
+
+template_service = TemplateService()
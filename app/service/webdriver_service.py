@@ -1,14 +1,13 @@
+from __future__ import annotations
+
 import os
-from typing import Callable
+import threading
+from contextlib import contextmanager
+from queue import Empty, SimpleQueue
+from typing import Callable, Iterator, Optional, TYPE_CHECKING
 
-from selenium import webdriver
-from selenium.common.exceptions import (
-    NoSuchElementException,
-    StaleElementReferenceException,
-)
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+if TYPE_CHECKING:
+    from selenium import webdriver
 
 
 class WebDriverService:
@@ -17,6 +16,8 @@ class WebDriverService:
     def __init__(self, create_window: bool):
         self.drivers: list[webdriver.Chrome] = []
         self.create_window = create_window
+        self._driver_path: Optional[str] = None
+        self._lock = threading.Lock()
 
     def create(self) -> webdriver.Chrome:
         """
@@ -24,7 +25,17 @@ class WebDriverService:
             # do your thing
         # driver.__exit__() will call quit()
         """
-        driver_path = ChromeDriverManager().install()
+        # selenium is imported on use, since it is slow to import
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        # the install is shared between the threads, since it may download the driver
+        with self._lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            driver_path = self._driver_path
         service = Service(driver_path)
         if not self.create_window and self.ON_WINDOWS:
             # https://www.zacoding.com/en/post/python-selenium-hide-console/
@@ -41,12 +52,62 @@ class WebDriverService:
         driver = webdriver.Chrome(
             executable_path=driver_path, service=service, options=options
         )
-        self.drivers.append(driver)
+        with self._lock:
+            self.drivers.append(driver)
         return driver
 
 
+class WebDriverPool:
+    """at most `size` drivers, created on demand and reused between the threads.
+
+    with WebDriverPool(WebDriverService(...), size) as pool:
+        with pool.acquire() as driver:
+            # do your thing
+    # the drivers are quit on exit"""
+
+    def __init__(self, service: WebDriverService, size: int):
+        self.service = service
+        self.size = size
+        self._idle_drivers: SimpleQueue[webdriver.Chrome] = SimpleQueue()
+        self._semaphore = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def acquire(self) -> Iterator[webdriver.Chrome]:
+        with self._semaphore:
+            try:
+                driver = self._idle_drivers.get_nowait()
+            except Empty:
+                driver = self.service.create()
+            try:
+                yield driver
+            except BaseException:
+                # the page state is unknown; do not hand it over to the next user
+                driver.quit()
+                raise
+            self._idle_drivers.put(driver)
+
+    def close(self) -> None:
+        while True:
+            try:
+                driver = self._idle_drivers.get_nowait()
+            except Empty:
+                return
+            driver.quit()
+
+    def __enter__(self) -> WebDriverPool:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
 def retry_webdriver(function: Callable, recursion_limit=1) -> Callable:
     def wrapper(self, *args):
+        from selenium.common.exceptions import (
+            NoSuchElementException,
+            StaleElementReferenceException,
+        )
+
         for recursion in range(recursion_limit):
             if recursion != 0:
                 print(f"selenium 재접속 {recursion}/{recursion_limit}회")
@@ -70,6 +70,14 @@ def serialize_block_contents_list(
     ]
 
 
+@dataclass
+class NestedBlockContents:
+    """block contents with its children, which are appended after the block is created."""
+
+    contents: BlockContents
+    children: list[BlockContents | NestedBlockContents] = field(default_factory=list)
+
+
 @dataclass
 class BookmarkBlockContents(BlockContents):
     url: str
@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import fields
 from enum import Enum
-from itertools import chain
-from typing import TypeVar, NewType, Iterable, Optional, Iterator, Sequence, overload
+from itertools import chain, islice
+from typing import (
+    TypeVar,
+    NewType,
+    Iterable,
+    Optional,
+    Iterator,
+    Sequence,
+    overload,
+    Callable,
+)
 
 from notion_df.core.exception import ImplementationError
 from notion_df.core.misc import repr_object
@@ -64,17 +74,54 @@ def peek(it: Iterable[T]) -> Optional[Iterator[T]]:
 
 
 class Paginator(Sequence[T]):
-    def __init__(self, element_type: type[T], it: Iterator[T]):
+    def __init__(
+        self, element_type: type[T], it: Iterator[T], limit: Optional[int] = None
+    ):
         self.element_type: type[T] = element_type
         """used on repr()"""
-        self._it: Iterator[T] = it
+        self.limit: Optional[int] = limit
+        """the max number of elements. if None, unlimited."""
+        self._it: Iterator[T] = it if limit is None else islice(it, limit)
         self._values: list[T] = []
+        self._wanted: Optional[int] = None
+        """the number of elements the current fetch needs. if None, all."""
+
+    @classmethod
+    def from_requests(
+        cls,
+        element_type: type[T],
+        fetch: Callable[[Callable[[], Optional[int]]], Iterator[T]],
+        limit: Optional[int] = None,
+    ) -> Paginator[T]:
+        """fetch() receives get_page_size_hint(), so that each request is sized to what is needed."""
+        paginator: Paginator[T]
+        paginator = cls(
+            element_type, fetch(lambda: paginator.get_page_size_hint()), limit
+        )
+        return paginator
 
     def __repr__(self):
-        return repr_object(self, element_type=self.element_type)
+        return repr_object(self, element_type=self.element_type, limit=self.limit)
+
+    def get_page_size_hint(self) -> Optional[int]:
+        """how many more elements the current fetch needs. if None, all."""
+        wanted = self._wanted
+        if self.limit is not None:
+            wanted = self.limit if wanted is None else min(wanted, self.limit)
+        if wanted is None:
+            return None
+        return max(wanted - len(self._values), 1)
+
+    def stream(self, window: int = 0) -> Stream[T]:
+        """iterate the rest once, without keeping the elements on the paginator.
+        the paginator should not be used afterward."""
+        values, self._values = self._values, []
+        self._wanted = None
+        return Stream(self.element_type, chain(values, self._it), window)
 
     def _fetch_until(self, index: int) -> None:
         """fetch until self._values[index] is possible"""
+        self._wanted = index + 1
         while len(self._values) <= index:
             try:
                 self._values.append(next(self._it))
@@ -82,13 +129,30 @@ class Paginator(Sequence[T]):
                 return
 
     def _fetch_all(self) -> None:
+        self._wanted = None
         for element in self._it:
             self._values.append(element)
 
+    def __iter__(self) -> Iterator[T]:
+        index = 0
+        while True:
+            if index == len(self._values):
+                self._wanted = None
+                try:
+                    self._values.append(next(self._it))
+                except StopIteration:
+                    return
+            yield self._values[index]
+            index += 1
+
     def __len__(self):
         self._fetch_all()
         return len(self._values)
 
+    def __bool__(self) -> bool:
+        self._fetch_until(0)
+        return bool(self._values)
+
     @overload
     def __getitem__(self, index_or_id: int) -> T: ...
 
@@ -116,12 +180,42 @@ class Paginator(Sequence[T]):
 
             start = index.start if index.start is not None else 0
             stop = index.stop if index.stop is not None else 0
-            self._fetch_until(max(start, stop))
+            self._fetch_until(max(start, stop - 1))
             return self._values[start:stop:step]
         else:
             raise TypeError(f"Expected int or slice, {self=}, {index=}")
 
 
+class Stream(Iterator[T]):
+    """one-pass iteration, which keeps only the last `window` elements."""
+
+    def __init__(self, element_type: type[T], it: Iterator[T], window: int = 0):
+        self.element_type: type[T] = element_type
+        """used on repr()"""
+        self._it: Iterator[T] = it
+        self._window: deque[T] = deque(maxlen=window)
+
+    def __repr__(self):
+        return repr_object(
+            self, element_type=self.element_type, window=self._window.maxlen
+        )
+
+    def __next__(self) -> T:
+        element = next(self._it)
+        if self._window.maxlen:
+            self._window.append(element)
+        return element
+
+    @property
+    def window(self) -> Sequence[T]:
+        """the last yielded elements, from the oldest."""
+        return tuple(self._window)
+
+    def chunks(self, size: int) -> Iterator[list[T]]:
+        while chunk := list(islice(self, size)):
+            yield chunk
+
+
 def coalesce_dataclass(target: T, source: T) -> None:
     """Modify the target, by filling None fields from source."""
     if type(target) is not type(source):
@@ -8,11 +8,11 @@ from datetime import datetime
 from typing import Any, TypeVar, MutableMapping, Final
 from uuid import UUID
 
-from loguru import logger
 from typing_extensions import Self
 
 from notion_df.core.collection import coalesce_dataclass
 from notion_df.core.serialization import Deserializable
+from notion_df.core.misc import logger
 
 real_data_dict: Final[MutableMapping[tuple[type[EntityData], UUID], EntityData]] = {}
 preview_data_dict: Final[MutableMapping[tuple[type[EntityData], UUID], EntityData]] = {}
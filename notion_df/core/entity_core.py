@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import sys
+import threading
 from abc import abstractmethod, ABCMeta
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
 from typing import (
     Final,
     Generic,
@@ -10,15 +15,15 @@ from typing import (
     TypeVar,
     Any,
     Callable,
+    Iterator,
 )
 from uuid import UUID
 
-from loguru import logger
 from typing_extensions import Self
 
 from notion_df.core.data_core import EntityDataT, real_data_dict, preview_data_dict
 from notion_df.core.exception import ImplementationError
-from notion_df.core.misc import undefined, repr_object, Undefined
+from notion_df.core.misc import undefined, repr_object, Undefined, logger
 
 
 class Entity(Hashable, Generic[EntityDataT], metaclass=ABCMeta):
@@ -82,11 +87,82 @@ class Entity(Hashable, Generic[EntityDataT], metaclass=ABCMeta):
 CallableT = TypeVar("CallableT", bound=Callable)
 
 
+class RetrievalTracker:
+    """counts the on-demand retrievals by the call site outside notion_df, to find the N+1 pattern,
+    that is, a loop which retrieves the entities one by one instead of prefetching them in bulk."""
+
+    _package_dir = str(Path(__file__).resolve().parents[1])
+
+    def __init__(self, threshold: int = 10):
+        self.threshold = threshold
+        """the call sites with more retrievals than this are reported."""
+        self.enabled = False
+        self.counter: Counter[tuple[str, str, str]] = Counter()
+        """(call site, entity class name, attribute name) -> the number of retrievals."""
+        self._lock = threading.Lock()
+
+    def record(self, entity: RetrievableEntity, attr_name: str) -> None:
+        if not self.enabled:
+            return
+        key = self._get_call_site(), type(entity).__name__, attr_name
+        with self._lock:
+            self.counter[key] += 1
+
+    def _get_call_site(self) -> str:
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename.startswith(
+            self._package_dir
+        ):
+            frame = frame.f_back
+        if frame is None:
+            return "<unknown>"
+        return f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+    def get_flagged(self) -> list[tuple[tuple[str, str, str], int]]:
+        with self._lock:
+            return [
+                (key, count)
+                for key, count in self.counter.most_common()
+                if count > self.threshold
+            ]
+
+    def report(self) -> None:
+        with self._lock:
+            total_count = sum(self.counter.values())
+        logger.info(f"{total_count} on-demand retrievals")
+        for (call_site, entity_cls_name, attr_name), count in self.get_flagged():
+            logger.warning(
+                f"N+1: {count} on-demand retrievals of {entity_cls_name}.{attr_name} at {call_site}."
+                f" prefetch them in bulk before the loop (ex: Database.query(), PageSnapshot)"
+            )
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """count the retrievals within the context, and report them at the end."""
+        previous_enabled = self.enabled
+        with self._lock:
+            previous_counter, self.counter = self.counter, Counter()
+        self.enabled = True
+        try:
+            yield
+        finally:
+            self.report()
+            self.enabled = previous_enabled
+            # the outer context also counts the nested one. otherwise, the counter is kept until the next run
+            if previous_enabled:
+                with self._lock:
+                    self.counter = previous_counter + self.counter
+
+
+retrieval_tracker = RetrievalTracker()
+
+
 def retrieve_on_demand(func: CallableT) -> CallableT:
     def wrapper(self: RetrievableEntity, *args, **kwargs):
         if (result := func(self, *args, **kwargs)) is not undefined:
             return result
         logger.debug(f"retrieve on-demand, {self=}")
+        retrieval_tracker.record(self, func.__name__)
         self.retrieve()
         if (result := func(self, *args, **kwargs)) is not undefined:
             return result
@@ -14,3 +14,10 @@ class ImplementationError(NotionDfException):
     If the error belongs to the notion_df package itself, please raise an issue."""
 
     pass
+
+
+class RelationLimitError(NotionDfException):
+    """The relation value exceeds the size the API can write at once,
+    and the excess could not be written from the other side of the relation."""
+
+    pass
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from notion_df.core.misc import logger
+
+current_action: ContextVar[str] = ContextVar("current_action", default="")
+"""the name of the running action, which the requests are attributed to."""
+
+latency_buckets: tuple[float, ...] = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 80)
+"""the upper bounds of the latency histogram, in seconds. the last bucket is +Inf."""
+
+_id_pattern = re.compile(
+    r"(?<![0-9a-f])[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}(?![0-9a-f])"
+)
+_property_id_pattern = re.compile(r"(/properties/)[^/]+")
+
+
+def get_path_template(path: str) -> str:
+    """ex) 'pages/0a1b...ef/properties/%3AbC' -> 'pages/{id}/properties/{property_id}'"""
+    path = _id_pattern.sub("{id}", path.strip("/"))
+    return _property_id_pattern.sub(r"\1{property_id}", path)
+
+
+@contextmanager
+def attribute(action: str) -> Iterator[None]:
+    """attribute the requests in the context to the action.
+    use ContextThreadPoolExecutor to keep it in the worker threads."""
+    token = current_action.set(action)
+    try:
+        yield
+    finally:
+        current_action.reset(token)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """runs each task in a copy of the submitting thread's context, which keeps current_action."""
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        return super().submit(copy_context().run, fn, *args, **kwargs)
+
+
+@dataclass
+class EndpointMetrics:
+    count: int = 0
+    latency_sum: float = 0
+    latency_bucket_counts: list[int] = field(
+        default_factory=lambda: [0] * (len(latency_buckets) + 1)
+    )
+    """the non-cumulative count of each bucket, with +Inf at the end."""
+    bytes_in: int = 0
+    bytes_out: int = 0
+    status_codes: Counter[str] = field(default_factory=Counter)
+    """'error' if the response was not received."""
+    retries: int = 0
+    rate_limit_wait: float = 0
+    """in seconds."""
+
+    def to_dict(self) -> dict[str, Any]:
+        cumulative_count = 0
+        cumulative_counts = {}
+        for bound, bucket_count in zip(
+            [*map(str, latency_buckets), "+Inf"], self.latency_bucket_counts
+        ):
+            cumulative_count += bucket_count
+            cumulative_counts[bound] = cumulative_count
+        return {
+            "count": self.count,
+            "latency_sum": self.latency_sum,
+            "latency_buckets": cumulative_counts,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "status_codes": dict(self.status_codes),
+            "retries": self.retries,
+            "rate_limit_wait": self.rate_limit_wait,
+        }
+
+
+class RequestMetrics:
+    """thread-safe counters of the requests, per (action, method, path template).
+    each record is a dict lookup and a few additions under a lock, cheap enough to leave on."""
+
+    def __init__(self):
+        self._endpoints: dict[tuple[str, str, str], EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, method: str, path: str) -> EndpointMetrics:
+        """should be called with the lock."""
+        key = current_action.get(), method, get_path_template(path)
+        if (endpoint := self._endpoints.get(key)) is None:
+            endpoint = self._endpoints[key] = EndpointMetrics()
+        return endpoint
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        status: str,
+        latency: float,
+        bytes_in: int,
+        bytes_out: int,
+        rate_limit_wait: float,
+    ) -> None:
+        bucket = bisect_left(latency_buckets, latency)
+        with self._lock:
+            endpoint = self._get(method, path)
+            endpoint.count += 1
+            endpoint.latency_sum += latency
+            endpoint.latency_bucket_counts[bucket] += 1
+            endpoint.bytes_in += bytes_in
+            endpoint.bytes_out += bytes_out
+            endpoint.status_codes[status] += 1
+            endpoint.rate_limit_wait += rate_limit_wait
+
+    def record_retry(self, method: str, path: str) -> None:
+        with self._lock:
+            self._get(method, path).retries += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return [
+                {"action": action, "method": method, "path": path, **endpoint.to_dict()}
+                for (action, method, path), endpoint in sorted(self._endpoints.items())
+            ]
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False)
+
+    def report(self, previous: Optional[list[dict[str, Any]]] = None) -> None:
+        """log the requests per endpoint, since the previous snapshot if given."""
+        previous_by_key = {
+            (endpoint["action"], endpoint["method"], endpoint["path"]): endpoint
+            for endpoint in previous or []
+        }
+        total_count = total_retries = 0
+        total_rate_limit_wait = 0.0
+        for endpoint in self.snapshot():
+            key = endpoint["action"], endpoint["method"], endpoint["path"]
+            previous_endpoint = previous_by_key.get(key, EndpointMetrics().to_dict())
+            count = endpoint["count"] - previous_endpoint["count"]
+            retries = endpoint["retries"] - previous_endpoint["retries"]
+            if not count and not retries:
+                continue
+            latency_sum = endpoint["latency_sum"] - previous_endpoint["latency_sum"]
+            rate_limit_wait = (
+                endpoint["rate_limit_wait"] - previous_endpoint["rate_limit_wait"]
+            )
+            logger.debug(
+                f"{' '.join(part for part in key if part)} : {count} requests, {retries} retries,"
+                f" {latency_sum / max(count, 1):.3f}s mean latency"
+            )
+            total_count += count
+            total_retries += retries
+            total_rate_limit_wait += rate_limit_wait
+        logger.info(
+            f"{total_count} requests, {total_retries} retries,"
+            f" {total_rate_limit_wait:.1f}s waited for the rate limit"
+        )
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """report the requests within the context at the end.
+        the counters are kept, so that the exported values stay cumulative."""
+        previous = self.snapshot()
+        try:
+            yield
+        finally:
+            self.report(previous)
+
+    def to_prometheus(self, prefix: str = "notion_df") -> str:
+        """the text exposition format. https://prometheus.io/docs/instrumenting/exposition_formats/
+        each metric family is a single group of samples after its TYPE line."""
+        endpoints = self.snapshot()
+        labels_list = [
+            ",".join(
+                f'{name}="{_escape_label(endpoint[name])}"'
+                for name in ["action", "method", "path"]
+            )
+            for endpoint in endpoints
+        ]
+        lines = [f"# TYPE {prefix}_requests_total counter"]
+        for endpoint, labels in zip(endpoints, labels_list):
+            for status, count in sorted(endpoint["status_codes"].items()):
+                lines.append(
+                    f'{prefix}_requests_total{{{labels},status="{status}"}} {count}'
+                )
+        lines.append(f"# TYPE {prefix}_request_duration_seconds histogram")
+        for endpoint, labels in zip(endpoints, labels_list):
+            for bound, count in endpoint["latency_buckets"].items():
+                lines.append(
+                    f'{prefix}_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                )
+            lines += [
+                f"{prefix}_request_duration_seconds_sum{{{labels}}} {endpoint['latency_sum']}",
+                f"{prefix}_request_duration_seconds_count{{{labels}}} {endpoint['count']}",
+            ]
+        for name, key in [
+            ("request_bytes_in_total", "bytes_in"),
+            ("request_bytes_out_total", "bytes_out"),
+            ("request_retries_total", "retries"),
+            ("rate_limit_wait_seconds_total", "rate_limit_wait"),
+        ]:
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for endpoint, labels in zip(endpoints, labels_list):
+                lines.append(f"{prefix}_{name}{{{labels}}} {endpoint[key]}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_metrics = RequestMetrics()
@@ -14,6 +14,18 @@ class Undefined:
 undefined = Undefined()
 
 
+class _LazyLogger:
+    """forwards to the loguru logger, which is imported on first use, since it is slow to import."""
+
+    def __getattr__(self, name: str) -> Any:
+        from loguru import logger as _logger
+
+        return getattr(_logger, name)
+
+
+logger = _LazyLogger()
+
+
 def repr_object(obj, *attrs: Any, **kw_attrs: Any) -> str:
     def _repr(_attr_value):
         return repr(_attr_value) if isinstance(_attr_value, str) else str(_attr_value)
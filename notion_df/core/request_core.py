@@ -1,25 +1,88 @@
 from __future__ import annotations
 
 import inspect
+import threading
+import time
 from abc import abstractmethod, ABCMeta
 from dataclasses import dataclass
-from typing import Generic, Any, final, Optional, Iterator
-
-import requests.exceptions
-import tenacity
-from loguru import logger
-from requests import Response
+from typing import Generic, Any, final, Optional, Iterator, TYPE_CHECKING, Callable
 
 from notion_df.core.collection import PlainStrEnum
 from notion_df.core.data_core import EntityDataT
 from notion_df.core.exception import ImplementationError, NotionDfException
-from notion_df.core.misc import repr_object
+from notion_df.core.metrics import request_metrics
+from notion_df.core.misc import repr_object, logger
 from notion_df.core.serialization import serialize
 
+if TYPE_CHECKING:
+    import requests
+    import tenacity
+    from requests import Response
+
 MAX_PAGE_SIZE = 100
 
 
+class RateLimiter:
+    """thread-safe token bucket, shared by every request of the process.
+    https://developers.notion.com/reference/request-limits"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        """average requests per second."""
+        self.burst = burst
+        """max requests sent at once after an idle period."""
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """block until the next request is allowed. returns the waited seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            # reserve the token in advance, so that waiting threads do not block each other
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+rate_limiter = RateLimiter(rate=3, burst=3)
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """the session shared by every request of the process, which keeps the connections alive.
+    requests is imported on the first call, since it is slow to import."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests.adapters
+
+            _session = requests.Session()
+            _session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=16))
+        return _session
+
+
+def get_retrying() -> tenacity.Retrying:
+    import tenacity
+
+    # TODO: add request info on TimeoutError
+    return tenacity.Retrying(
+        wait=tenacity.wait_none(),
+        stop=tenacity.stop_after_attempt(3),
+        retry=tenacity.retry_if_exception(is_server_error),
+    )
+
+
 def is_server_error(exception: BaseException) -> bool:
+    import requests.exceptions
+
     # http request completed with failure response
     if isinstance(exception, RequestError):
         status_code = exception.response.status_code
@@ -64,22 +127,54 @@ class Request:
     def url(self) -> str:
         return f"{self.version.base_url.rstrip('/')}/{self.path.lstrip('/')}"
 
-    @tenacity.retry(
-        wait=tenacity.wait_none(),
-        stop=tenacity.stop_after_attempt(3),
-        retry=tenacity.retry_if_exception(is_server_error),
-    )  # TODO: add request info on TimeoutError
     def execute(self) -> Response:
+        attempt_count = 0
+
+        def execute_once() -> Response:
+            nonlocal attempt_count
+            attempt_count += 1
+            if attempt_count > 1:
+                request_metrics.record_retry(self.method.value, self.path)
+            return self._execute_once()
+
+        return get_retrying()(execute_once)
+
+    def _execute_once(self) -> Response:
+        import requests
+
         logger.debug(self)
-        # TODO[1]: catch RequestException
-        response = requests.request(
-            method=self.method.value,
-            url=self.url,
-            headers=self.headers,
-            params=self.params,
-            json=self.json,
-            timeout=80,
-        )  # TODO: relate with tenacity
+        rate_limit_wait = rate_limiter.acquire()
+        start_time = time.perf_counter()
+        try:
+            # TODO[1]: catch RequestException
+            response = get_session().request(
+                method=self.method.value,
+                url=self.url,
+                headers=self.headers,
+                params=self.params,
+                json=self.json,
+                timeout=80,
+            )  # TODO: relate with tenacity
+        except requests.RequestException:
+            request_metrics.record(
+                self.method.value,
+                self.path,
+                "error",
+                time.perf_counter() - start_time,
+                0,
+                0,
+                rate_limit_wait,
+            )
+            raise
+        request_metrics.record(
+            self.method.value,
+            self.path,
+            str(response.status_code),
+            time.perf_counter() - start_time,
+            len(response.content),
+            len(response.request.body or b""),
+            rate_limit_wait,
+        )
         try:
             response.raise_for_status()
             return response
@@ -101,6 +196,8 @@ class RequestError(NotionDfException):
     """ex) 'Unsaved transactions: Invalid value for property with limit'"""
 
     def __init__(self, request: Request, response: Response):
+        import requests
+
         self.response = response
         self.request = request
         try:
@@ -198,19 +295,25 @@ class SingleRequestBuilder(Generic[EntityDataT], RequestBuilder, metaclass=ABCMe
 
 class PaginatedRequestBuilder(Generic[EntityDataT], RequestBuilder, metaclass=ABCMeta):
     data_element_type: type[EntityDataT]
-    page_size: (
-        int  # TODO - AS-IS: total size of all pages summed, TO-BE: each request size
-    )
+    page_size: Optional[int]
+    """the max number of elements per request. if None, MAX_PAGE_SIZE."""
 
     def __init_subclass__(cls, **kwargs):
         if not inspect.isabstract(cls):
             assert cls.data_element_type
 
     @final
-    def execute(self) -> Iterator[EntityDataT]:
+    def execute(
+        self, get_page_size_hint: Callable[[], Optional[int]] = lambda: None
+    ) -> Iterator[EntityDataT]:
+        """get_page_size_hint() is called before each request,
+        and returns how many more elements the caller needs for now (None if all)."""
         start_cursor = None
         while True:
-            data = request_page(self, self.page_size, start_cursor)
+            page_size = min(
+                self.page_size or MAX_PAGE_SIZE, get_page_size_hint() or MAX_PAGE_SIZE
+            )
+            data = request_page(self, page_size, start_cursor)
             yield from self.parse_response_data(data)
             if not data["has_more"]:
                 return
@@ -27,7 +27,6 @@ from typing import (
 )
 from uuid import UUID
 
-import dateutil.parser
 from typing_extensions import Self
 
 from notion_df.core.exception import NotionDfException, ImplementationError
@@ -362,12 +361,21 @@ def serialize_datetime(dt: date | datetime):
     return dt.isoformat()
 
 
+_date_pattern = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
 def deserialize_datetime(serialized: str) -> date | datetime:
     try:
-        dt = dateutil.parser.parse(serialized)
-    except dateutil.parser.ParserError as e:
-        print(serialized)
-        raise e
-    if re.match(r"^\d{4}-\d{2}-\d{2}$", serialized):
+        # fast path for the ISO 8601 format, which the API always returns
+        dt = datetime.fromisoformat(serialized)
+    except ValueError:
+        import dateutil.parser
+
+        try:
+            dt = dateutil.parser.parse(serialized)
+        except dateutil.parser.ParserError as e:
+            print(serialized)
+            raise e
+    if _date_pattern.match(serialized):
         return dt.date()
     return dt.astimezone(my_tz)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import (
     Optional,
@@ -11,10 +13,11 @@ from typing import (
     cast,
     Generic,
     TYPE_CHECKING,
+    Iterator,
+    Callable,
 )
 from uuid import UUID
 
-from loguru import logger
 from typing_extensions import Self
 
 from notion_df.core.collection import Paginator
@@ -23,19 +26,26 @@ from notion_df.core.entity_core import (
     HaveChildren,
     BaseBlock,
 )
-from notion_df.core.exception import ImplementationError
-from notion_df.core.misc import undefined, repr_object
+from notion_df.core.exception import ImplementationError, RelationLimitError
+from notion_df.core.metrics import ContextThreadPoolExecutor
+from notion_df.core.misc import undefined, repr_object, logger
 from notion_df.core.request_core import RequestError
 from notion_df.core.uuid_parser import get_page_or_database_id, get_block_id
 from notion_df.core.variable import token
 
 if TYPE_CHECKING:
-    from notion_df.contents import BlockContents
+    from notion_df.contents import BlockContents, NestedBlockContents
     from notion_df.data import BlockData, DatabaseData, PageData
     from notion_df.file import ExternalFile, File
     from notion_df.filter import Filter
     from notion_df.misc import Icon
-    from notion_df.property import Property, PageProperties, DatabaseProperties, PPVT
+    from notion_df.property import (
+        Property,
+        PageProperties,
+        DatabaseProperties,
+        PPVT,
+        RelationPagePropertyValue,
+    )
     from notion_df.rich_text import RichText
     from notion_df.sort import Sort, Direction
     from notion_df.user import PartialUser
@@ -74,6 +84,7 @@ class Workspace(HaveChildren):
         entity: Literal["page"],
         sort_by_last_edited_time: Direction = "descending",
         page_size: int = None,
+        limit: Optional[int] = None,
     ) -> Paginator[Page]: ...
 
     @staticmethod
@@ -83,6 +94,7 @@ class Workspace(HaveChildren):
         entity: Literal["database"],
         sort_by_last_edited_time: Direction = "descending",
         page_size: int = None,
+        limit: Optional[int] = None,
     ) -> Paginator[Database]: ...
 
     @staticmethod
@@ -92,6 +104,7 @@ class Workspace(HaveChildren):
         entity: Literal[None],
         sort_by_last_edited_time: Direction = "descending",
         page_size: int = None,
+        limit: Optional[int] = None,
     ) -> Paginator[Union[Page, Database]]: ...
 
     @staticmethod
@@ -100,18 +113,19 @@ class Workspace(HaveChildren):
         entity: Literal["page", "database", None] = None,
         sort_by_last_edited_time: Direction = "descending",
         page_size: int = None,
+        limit: Optional[int] = None,
     ) -> Paginator[Union[Page, Database]]:
         from notion_df.request.search import SearchByTitle
         from notion_df.sort import TimestampSort
         from notion_df.data import DatabaseData, PageData
 
-        contents_it = SearchByTitle(
+        request = SearchByTitle(
             token,
             query,
             entity,
             TimestampSort("last_edited_time", sort_by_last_edited_time),
             page_size,
-        ).execute()
+        )
         if entity == "page":
             element_type = Page
         elif entity == "database":
@@ -119,8 +133,8 @@ class Workspace(HaveChildren):
         else:
             element_type = Page | Database
 
-        def it():
-            for data in contents_it:
+        def it(get_page_size_hint: Callable[[], Optional[int]]):
+            for data in request.execute(get_page_size_hint):
                 match data:
                     case DatabaseData():
                         yield Database(data.id)
@@ -129,7 +143,7 @@ class Workspace(HaveChildren):
                     case _:
                         raise RuntimeError(f"invalid class. {data=}")
 
-        return Paginator(element_type, it())
+        return Paginator.from_requests(element_type, it, limit)
 
 
 class Block(BaseBlock["BlockData"], Generic[BlockT]):
@@ -194,18 +208,29 @@ class Block(BaseBlock["BlockData"], Generic[BlockT]):
         RetrieveBlock(token, self.id).execute()
         return self
 
-    def retrieve_children(self) -> Paginator[Block]:
+    def retrieve_children(self, limit: Optional[int] = None) -> Paginator[Block]:
         logger.info(f"Block.retrieve_children({self})")
         from notion_df.request.block import RetrieveBlockChildren
 
-        return Paginator(
+        return Paginator.from_requests(
             Block,
-            (
+            lambda get_page_size_hint: (
                 Block(block_data.id)
-                for block_data in RetrieveBlockChildren(token, self.id).execute()
+                for block_data in RetrieveBlockChildren(token, self.id).execute(
+                    get_page_size_hint
+                )
             ),
+            limit,
         )
 
+    def retrieve_tree(
+        self, max_depth: Optional[int] = None, concurrency: int = 3
+    ) -> BlockTree:
+        """retrieve the nested children breadth-first, with the sibling subtrees fetched concurrently.
+        the blocks of child pages and child databases are not expanded.
+        max_depth=1 is equivalent to retrieve_children()."""
+        return BlockTree(self, max_depth, concurrency)
+
     def update(
         self, block_type: Optional[BlockContents], archived: Optional[bool]
     ) -> Self:
@@ -228,17 +253,21 @@ class Block(BaseBlock["BlockData"], Generic[BlockT]):
                 raise e
         return self
 
-    def append_children(self, child_values: list[BlockContents]) -> list[Block]:
+    def append_children(
+        self, child_values: list[BlockContents | NestedBlockContents]
+    ) -> list[Block]:
+        """the children are split into batches as needed.
+        returns the first-level children in order."""
         logger.info(f"Block.append_children({self})")
         if not child_values:
             return []
-        from notion_df.request.block import AppendBlockChildren
+        from notion_df.request.block import append_block_children_in_batches
 
         return [
             Block(block_data.id)
-            for block_data in AppendBlockChildren(
+            for block_data in append_block_children_in_batches(
                 token, self.id, child_values
-            ).execute()
+            )
         ]
 
     def create_child_database(
@@ -257,6 +286,86 @@ class Block(BaseBlock["BlockData"], Generic[BlockT]):
         )
 
 
+@dataclass(eq=False)
+class BlockTreeNode:
+    block: Block
+    parent: Optional[BlockTreeNode] = field(repr=False)
+    depth: int
+    """0 for the root."""
+    children: list[BlockTreeNode] = field(default_factory=list, repr=False)
+
+    def walk(self) -> Iterator[BlockTreeNode]:
+        """iterate the subtree depth-first, in the document order."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+class BlockTree:
+    """the nested children of a block, fetched on iteration.
+    iterating yields the nodes as they arrive, and fetches the rest of the tree if needed."""
+
+    def __init__(self, block: Block, max_depth: Optional[int], concurrency: int):
+        self.root = BlockTreeNode(block, None, 0)
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self._it = self._fetch()
+        self._nodes: list[BlockTreeNode] = []
+
+    def __repr__(self) -> str:
+        return repr_object(self, root=self.root.block, max_depth=self.max_depth)
+
+    def __iter__(self) -> Iterator[BlockTreeNode]:
+        yield from self._nodes
+        for node in self._it:
+            self._nodes.append(node)
+            yield node
+
+    def fetch_all(self) -> BlockTreeNode:
+        for _ in self:
+            pass
+        return self.root
+
+    def _should_expand(self, node: BlockTreeNode) -> bool:
+        from notion_df.contents import (
+            ChildPageBlockContents,
+            ChildDatabaseBlockContents,
+        )
+
+        if self.max_depth is not None and node.depth >= self.max_depth:
+            return False
+        if node is self.root:
+            return True
+        return node.block.has_children and not isinstance(
+            node.block.contents, (ChildPageBlockContents, ChildDatabaseBlockContents)
+        )
+
+    def _fetch(self) -> Iterator[BlockTreeNode]:
+        def retrieve_children(_node: BlockTreeNode) -> list[Block]:
+            return list(_node.block.retrieve_children())
+
+        executor = ContextThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="BlockTree"
+        )
+        try:
+            # the executor runs the submitted requests in order, which keeps the fetch breadth-first
+            pending: dict[Future[list[Block]], BlockTreeNode] = {}
+            if self._should_expand(self.root):
+                pending[executor.submit(retrieve_children, self.root)] = self.root
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    parent = pending.pop(future)
+                    for block in future.result():
+                        node = BlockTreeNode(block, parent, parent.depth + 1)
+                        parent.children.append(node)
+                        yield node
+                        if self._should_expand(node):
+                            pending[executor.submit(retrieve_children, node)] = node
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
 class Database(BaseBlock["DatabaseData"], Generic[PageT]):
     @classmethod
     def get_data_cls(cls) -> type[DatabaseData]:
@@ -352,25 +461,23 @@ class Database(BaseBlock["DatabaseData"], Generic[PageT]):
     def create_child_page(
         self,
         properties: Optional[PageProperties] = None,
-        children: Optional[list[BlockContents]] = None,
+        children: Optional[list[BlockContents | NestedBlockContents]] = None,
         icon: Optional[Icon] = None,
         cover: Optional[File] = None,
     ) -> Page:
         logger.info(f"Database.create_child_page({self})")
-        from notion_df.request.page import CreatePage
+        from notion_df.request.page import create_page
         from notion_df.misc import PartialParent
 
         return Page(
-            CreatePage(
+            create_page(
                 token,
                 PartialParent("database_id", self.id),
                 properties,
                 children,
                 icon,
                 cover,
-            )
-            .execute()
-            .id
+            ).id
         )
 
     # noinspection PyShadowingBuiltins
@@ -379,18 +486,22 @@ class Database(BaseBlock["DatabaseData"], Generic[PageT]):
         filter: Optional[Filter] = None,
         sort: Optional[list[Sort]] = None,
         page_size: Optional[int] = None,
+        limit: Optional[int] = None,
     ) -> Paginator[Page]:  # TODO: temp fix since generic[PageT] not recognized
+        """page_size is the max number of pages per request, and limit is the max number of pages in total.
+        each request is sized to what the paginator needs."""
         logger.info(f"Database.query({self})")
         from notion_df.request.database import QueryDatabase
 
-        return Paginator(
+        return Paginator.from_requests(
             Page,
-            (
+            lambda get_page_size_hint: (
                 Page(page_data.id)
                 for page_data in QueryDatabase(
                     token, self.id, filter, sort, page_size
-                ).execute()
+                ).execute(get_page_size_hint)
             ),
+            limit,
         )
 
 
@@ -524,16 +635,81 @@ class Page(BaseBlock["PageData"]):
             prop, prop_value, prop_serialized = RetrievePagePropertyItem(
                 token, self.id, property_id
             ).execute()
-        if self.data:
-            if not prop.name:
-                # noinspection PyProtectedMember
-                prop = self.data.properties._prop_by_id[prop.id]
-            self.data.properties[prop] = prop_value
-            cast(dict[str, Any], self.data.raw["properties"][prop.name]).update(
-                prop_serialized
-            )
+        self._merge_property_item(prop, prop_value, prop_serialized)
         return prop_value
 
+    def complete_properties(self, max_workers: int = 3) -> Self:
+        """retrieve the truncated property values concurrently, and merge them into the local data.
+        the page object truncates relations, titles, rich texts and people at 25 items,
+        and its rollups may be inaccurate if a relation is truncated."""
+        logger.info(f"Page.complete_properties({self})")
+        from notion_df.request.page import RetrievePagePropertyItem
+
+        props = self._get_truncated_props()
+        if not props:
+            return self
+        with ContextThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="Page.complete_properties"
+        ) as executor:
+            results = list(
+                executor.map(
+                    lambda prop: RetrievePagePropertyItem(
+                        token, self.id, prop.id
+                    ).execute(),
+                    props,
+                )
+            )
+        for prop, (_, prop_value, prop_serialized) in zip(props, results):
+            self._merge_property_item(prop, prop_value, prop_serialized)
+        return self
+
+    def _get_truncated_props(self) -> list[Property]:
+        from notion_df.property import (
+            PeopleProperty,
+            RelationProperty,
+            RichTextProperty,
+            RollupProperty,
+            TitleProperty,
+        )
+
+        truncated_size = 25
+        relation_truncated = False
+        props = []
+        for prop, prop_value in self.properties.items():
+            if isinstance(prop, RelationProperty) and prop_value.has_more:
+                relation_truncated = True
+                props.append(prop)
+            elif (
+                isinstance(prop, (TitleProperty, RichTextProperty, PeopleProperty))
+                and len(prop_value) >= truncated_size
+            ):
+                props.append(prop)
+        if relation_truncated:
+            # the property item of an array rollup is not supported
+            props.extend(
+                prop
+                for prop, prop_value in self.properties.items()
+                if isinstance(prop, RollupProperty)
+                and prop_value.value_typename != "array"
+            )
+        return props
+
+    def _merge_property_item(
+        self,
+        prop: Property,
+        prop_value: PPVT,
+        prop_serialized: dict[str, Any],
+    ) -> None:
+        if not self.data:
+            return
+        if not prop.name:
+            # noinspection PyProtectedMember
+            prop = self.data.properties._prop_by_id[prop.id]
+        self.data.properties[prop] = prop_value
+        cast(dict[str, Any], self.data.raw["properties"][prop.name]).update(
+            prop_serialized
+        )
+
     def update(
         self,
         properties: Optional[PageProperties] = None,
@@ -541,34 +717,134 @@ class Page(BaseBlock["PageData"]):
         cover: Optional[ExternalFile] = None,
         archived: Optional[bool] = None,
     ) -> Self:
+        """the relation values of any size are accepted.
+        a value over MAX_RELATION_SIZE is written from the synced side of the dual relation,
+        only on the pages of which the link changes."""
         logger.info(f"Page.update({self})")
-        from notion_df.request.page import UpdatePage
-
-        UpdatePage(token, self.id, properties, icon, cover, archived).execute()
+        from notion_df.request.page import UpdatePage, MAX_RELATION_SIZE
+        from notion_df.property import PageProperties, RelationPagePropertyValue
+
+        large_relations: dict[Property, RelationPagePropertyValue] = {}
+        if properties:
+            properties = PageProperties(dict(properties.items()))
+            for prop, prop_value in list(properties.items()):
+                if (
+                    isinstance(prop_value, RelationPagePropertyValue)
+                    and len(prop_value) > MAX_RELATION_SIZE
+                ):
+                    # writing a part of the value from this side would unlink the rest
+                    large_relations[prop] = prop_value
+                    del properties[prop]
+        if (
+            properties
+            or not large_relations
+            or any(value is not None for value in [icon, cover, archived])
+        ):
+            UpdatePage(token, self.id, properties, icon, cover, archived).execute()
+        for prop, prop_value in large_relations.items():
+            self._update_large_relation(prop, prop_value)
         return self
 
+    def _update_large_relation(
+        self, prop: Property, prop_value: RelationPagePropertyValue
+    ) -> None:
+        from notion_df.request.page import UpdatePage, MAX_RELATION_SIZE
+        from notion_df.property import (
+            DualRelationDatabasePropertyValue,
+            PageProperties,
+        )
+
+        database = self.parent
+        db_prop_value = (
+            database.properties.get(prop.name)
+            if isinstance(database, Database)
+            else None
+        )
+        if not isinstance(db_prop_value, DualRelationDatabasePropertyValue):
+            raise RelationLimitError(
+                "only the dual relation can exceed the size limit",
+                {"self": self, "prop": prop, "size": len(prop_value)},
+            )
+        synced_prop = db_prop_value.synced_property
+        # noinspection PyProtectedMember
+        prop_with_id = database.properties._get_prop(prop.name)
+        current_value = self.retrieve_property_item(prop_with_id)
+        # the links already as requested are skipped
+        pages_to_link = prop_value - current_value
+        pages_to_unlink = current_value - prop_value
+        pages_to_keep = current_value - pages_to_unlink
+        if len(pages_to_keep) < MAX_RELATION_SIZE:
+            # a single write from this side, which keeps every link to keep, and unlinks the others
+            room = MAX_RELATION_SIZE - len(pages_to_keep)
+            UpdatePage(
+                token,
+                self.id,
+                PageProperties({prop_with_id: pages_to_keep + pages_to_link[:room]}),
+            ).execute()
+            pages_to_link = pages_to_link[room:]
+            pages_to_unlink = []
+
+        def update_synced_side(that_page: Page, link: bool) -> None:
+            synced_pages = that_page.retrieve_property_item(synced_prop)
+            if (self in synced_pages) == link:
+                return
+            if link:
+                synced_pages = synced_pages + [self]
+            else:
+                synced_pages = synced_pages - [self]
+            if len(synced_pages) > MAX_RELATION_SIZE:
+                # the link cannot be written from either side
+                raise RelationLimitError(
+                    "both sides of the relation exceed the size limit",
+                    {"self": self, "prop": prop, "that_page": that_page},
+                )
+            UpdatePage(
+                token, that_page.id, PageProperties({synced_prop: synced_pages})
+            ).execute()
+
+        with ContextThreadPoolExecutor(
+            max_workers=3, thread_name_prefix="Page.update"
+        ) as executor:
+            list(
+                executor.map(
+                    update_synced_side,
+                    [*pages_to_link, *pages_to_unlink],
+                    [True] * len(pages_to_link) + [False] * len(pages_to_unlink),
+                )
+            )
+
+        result_value = self.retrieve_property_item(prop_with_id)
+        if set(result_value) != set(prop_value):
+            raise RelationLimitError(
+                "the relation value is not written as requested",
+                {
+                    "self": self,
+                    "prop": prop,
+                    "missing": list(prop_value - result_value),
+                    "unexpected": list(result_value - prop_value),
+                },
+            )
+
     def create_child_page(
         self,
         properties: Optional[PageProperties] = None,
-        children: Optional[list[BlockContents]] = None,
+        children: Optional[list[BlockContents | NestedBlockContents]] = None,
         icon: Optional[Icon] = None,
         cover: Optional[File] = None,
     ) -> Page:
         logger.info(f"Page.create_child_page({self})")
-        from notion_df.request.page import CreatePage
+        from notion_df.request.page import create_page
         from notion_df.misc import PartialParent
 
         return Page(
-            CreatePage(
+            create_page(
                 token,
                 PartialParent("page_id", self.id),
                 properties,
                 children,
                 icon,
                 cover,
-            )
-            .execute()
-            .id
+            ).id
         )
 
     def create_child_database(
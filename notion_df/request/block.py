@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 from dataclasses import dataclass, field
 from typing import Any
 from uuid import UUID
 
-from notion_df.contents import BlockContents, serialize_block_contents_list
+from notion_df.contents import (
+    BlockContents,
+    NestedBlockContents,
+    serialize_block_contents_list,
+)
 from notion_df.core.collection import DictFilter
+from notion_df.core.metrics import ContextThreadPoolExecutor
 from notion_df.core.request_core import (
     SingleRequestBuilder,
     RequestSettings,
@@ -15,6 +21,9 @@ from notion_df.core.request_core import (
 )
 from notion_df.data import BlockData
 
+MAX_CHILDREN_SIZE = 100
+"""the max number of children in a request body."""
+
 
 @dataclass
 class AppendBlockChildren(SingleRequestBuilder[list[BlockData]]):
@@ -23,7 +32,7 @@ class AppendBlockChildren(SingleRequestBuilder[list[BlockData]]):
     data_type = list[BlockData]
     id: UUID
     children: list[BlockContents]
-    # TODO: split to multiple requests when len(children) > 100
+    """use append_block_children_in_batches() for more than MAX_CHILDREN_SIZE children."""
 
     def get_settings(self) -> RequestSettings:
         return RequestSettings(
@@ -41,6 +50,48 @@ class AppendBlockChildren(SingleRequestBuilder[list[BlockData]]):
         return data_element_list
 
 
+def append_block_children_in_batches(
+    token: str,
+    id: UUID,
+    children: list[BlockContents | NestedBlockContents],
+    max_workers: int = 3,
+) -> list[BlockData]:
+    """append the children with as many requests as needed, and return the first-level children in order.
+    the children of a block are appended batch by batch,
+    and the nested children are appended as soon as their parent is created, in parallel with the other blocks."""
+
+    def append_batches(
+        _id: UUID, _children: list[BlockContents | NestedBlockContents]
+    ) -> list[BlockData]:
+        data_list = []
+        for i in range(0, len(_children), MAX_CHILDREN_SIZE):
+            contents_list = [
+                child.contents if isinstance(child, NestedBlockContents) else child
+                for child in _children[i : i + MAX_CHILDREN_SIZE]
+            ]
+            data_list.extend(AppendBlockChildren(token, _id, contents_list).execute())
+        return data_list
+
+    executor = ContextThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="AppendBlockChildren"
+    )
+    try:
+        root_future = executor.submit(append_batches, id, children)
+        pending: dict[Future[list[BlockData]], list] = {root_future: children}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for child, data in zip(pending.pop(future), future.result()):
+                    if isinstance(child, NestedBlockContents) and child.children:
+                        nested_future = executor.submit(
+                            append_batches, data.id, child.children
+                        )
+                        pending[nested_future] = child.children
+        return root_future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
 @dataclass
 class RetrieveBlock(SingleRequestBuilder[BlockData]):
     """https://developers.notion.com/reference/retrieve-a-block"""
@@ -4,7 +4,11 @@ from dataclasses import dataclass, field
 from typing import Any, Optional
 from uuid import UUID
 
-from notion_df.contents import BlockContents, serialize_block_contents_list
+from notion_df.contents import (
+    BlockContents,
+    NestedBlockContents,
+    serialize_block_contents_list,
+)
 from notion_df.core.collection import DictFilter
 from notion_df.core.request_core import (
     SingleRequestBuilder,
@@ -18,6 +22,7 @@ from notion_df.data import PageData
 from notion_df.file import ExternalFile
 from notion_df.misc import Icon, PartialParent
 from notion_df.property import PageProperties, Property, property_registry, PPVT
+from notion_df.request.block import MAX_CHILDREN_SIZE, append_block_children_in_batches
 
 
 @dataclass
@@ -60,6 +65,33 @@ class CreatePage(SingleRequestBuilder[PageData]):
         )
 
 
+MAX_RELATION_SIZE = 100
+"""the max number of pages in a relation value of a request body."""
+
+
+def create_page(
+    token: str,
+    parent: PartialParent,
+    properties: Optional[PageProperties] = None,
+    children: Optional[list[BlockContents | NestedBlockContents]] = None,
+    icon: Optional[Icon] = None,
+    cover: Optional[ExternalFile] = None,
+) -> PageData:
+    """create the page with the leading flat children, and append the rest in batches."""
+    children = children or []
+    flat_size = 0
+    while flat_size < min(len(children), MAX_CHILDREN_SIZE) and not isinstance(
+        children[flat_size], NestedBlockContents
+    ):
+        flat_size += 1
+    page_data = CreatePage(
+        token, parent, properties, children[:flat_size], icon, cover
+    ).execute()
+    if children[flat_size:]:
+        append_block_children_in_batches(token, page_data.id, children[flat_size:])
+    return page_data
+
+
 @dataclass
 class UpdatePage(SingleRequestBuilder[PageData]):
     """https://developers.notion.com/reference/patch-page"""
@@ -118,15 +150,22 @@ class RetrievePagePropertyItem(RequestBuilder):
             data_list.append(data)
 
         typename = data_list[0]["property_item"]["type"]
-        raw_value_list = []
-        for data in data_list:
-            for result in data["results"]:
-                raw_value_list.append(result[typename])
-        prop_serialized = {
-            "type": typename,
-            typename: raw_value_list,
-            "has_more": False,
-        }
+        if typename == "rollup":
+            # the rollup value is computed on the last page
+            prop_serialized = {
+                "type": typename,
+                typename: data_list[-1]["property_item"][typename],
+            }
+        else:
+            raw_value_list = []
+            for data in data_list:
+                for result in data["results"]:
+                    raw_value_list.append(result[typename])
+            prop_serialized = {
+                "type": typename,
+                typename: raw_value_list,
+                "has_more": False,
+            }
 
         # TODO deduplicate with PageProperties._deserialize_this()
         property_key_cls = property_registry[typename]
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.action.media_scrap.gy_lib_http_scraper import (
+    GYLibraryHTTPScraper,
+    UnexpectedPageError,
+    url_main_page,
+)
+
+main_page = """<form id="searchForm" action="searchResult.do" method="get">
+<input type="hidden" name="searchType" value="SIMPLE">
+<input type="text" id="searchKeyword" name="searchKeyword" value="">
+<input type="checkbox" id="searchLibraryAll" name="searchLibraryAll" value="ALL" checked>
+<input type="checkbox" id="searchManageCodeArr2" name="searchManageCodeArr" value="MG">
+<button id="searchBtn">검색</button>
+</form>"""
+
+
+def get_result_page(availability: str, next_href: str) -> str:
+    return f"""<div id="bookList"><div class="bookList listViewStyle"><ul><li>
+<div class="bookArea"><div class="bookData"><div>
+<div><p class="kor on"><span>a</span><span>b</span><span> 813.6 -21 </span></p></div>
+<ul><li class="title"><span><strong>{availability}</strong></span></li></ul>
+</div></div></div></li></ul></div>
+<div class="pagingWrap"><p><strong>1</strong><a href="{next_href}">2</a></p></div></div>"""
+
+
+class FakeSession:
+    def __init__(self, pages: dict[str, str]):
+        self.pages = pages
+        self.params = []
+
+    def get(self, url, params=None, timeout=None):
+        if params is not None:
+            self.params.append(params)
+            url = f"{url}?searched"
+        return SimpleNamespace(
+            text=self.pages[url], url=url, raise_for_status=lambda: None
+        )
+
+
+def test_gy_lib_http_scraper():
+    result_url = (
+        "https://www.goyanglib.or.kr/center/menu/10003/program/30001/searchResult.do"
+    )
+    session = FakeSession(
+        {
+            url_main_page: main_page,
+            f"{result_url}?searched": get_result_page("대출중", "?page=2"),
+            f"{result_url}?page=2": get_result_page("대출가능", ""),
+        }
+    )
+    result = GYLibraryHTTPScraper("책", "all_libs", session=session).execute()
+    assert result.available and result.lib_key == "all_libs"
+    assert result.search_url == f"{result_url}?searched"
+    assert session.params[-1] == [
+        ("searchType", "SIMPLE"),
+        ("searchKeyword", "책"),
+        ("searchLibraryAll", "ALL"),
+    ]
+
+    result = GYLibraryHTTPScraper("책", "gajwa", session=session).execute()
+    assert result.book_code == "813.6 -21" and not result.available
+    assert session.params[-1] == [
+        ("searchType", "SIMPLE"),
+        ("searchKeyword", "책"),
+        ("searchManageCodeArr", "MG"),
+    ]
+
+    session.pages[url_main_page] = "<div>rendered by script</div>"
+    with pytest.raises(UnexpectedPageError):
+        GYLibraryHTTPScraper("책", "gajwa", session=session).execute()
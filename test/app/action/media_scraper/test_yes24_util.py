@@ -1,6 +1,13 @@
+import json
+from datetime import timedelta
 from pprint import pprint
+from types import SimpleNamespace
 
-from app.action.media_scrap.yes24_scraper import parse_contents
+import pytest
+
+from app.action.media_scrap import yes24_scraper
+from app.action.media_scrap.yes24_scraper import parse_contents, Yes24ScrapResult
+from app.service.http_cache_service import HTTPCacheService
 
 
 def test_parse_contents():
@@ -20,3 +27,85 @@ def test_parse_contents():
     html = "<b>CHAPTER 03 넷플릭스의 도구들</b>"
     # print(CHARS_TO_DELETE)
     pprint(parse_contents(html))
+
+
+def test_yes24_replay(tmp_path, monkeypatch):
+    session = SimpleNamespace(
+        get=lambda url, headers, timeout: SimpleNamespace(
+            status_code=200,
+            ok=True,
+            headers={},
+            text='<ul id="yesSchList"><li><div><div class="item_info">'
+            '<div class="info_row info_name"><a class="gd_name" href="/Product/Goods/1">'
+            "</a></div></div></div></li></ul>",
+        )
+    )
+    monkeypatch.setattr(
+        yes24_scraper, "http_cache", HTTPCacheService(tmp_path, session=session)
+    )
+    monkeypatch.setattr(
+        yes24_scraper, "_detail_page_urls", yes24_scraper.Memo(8, timedelta(days=1))
+    )
+    url = "https://www.yes24.com/Product/Goods/1"
+    assert yes24_scraper._get_yes24_detail_page_url("책 이름") == url
+
+    # replayed from the cache, with no network
+    monkeypatch.setattr(
+        yes24_scraper, "http_cache", HTTPCacheService(tmp_path, offline=True)
+    )
+    assert yes24_scraper.get_yes24_detail_page_url("  책  이름!") == url
+    assert yes24_scraper._detail_page_urls.get("책 이름") == url
+
+
+def test_yes24_memo():
+    now = 0.0
+    memo = yes24_scraper.Memo(2, timedelta(seconds=10), clock=lambda: now)
+    memo.set("a", 1)
+    memo.set("b", 2)
+    assert memo.get("a") == 1
+    # the least recently used one is evicted
+    memo.set("c", 3)
+    assert (memo.get("a"), memo.get("b"), memo.get("c")) == (1, None, 3)
+    now = 10.0
+    assert memo.get("a") is None
+
+
+def test_parser_parity(tmp_path):
+    from app.script.benchmark_yes24_parser import benchmark_yes24_parser
+
+    detail_page = """<html><body>
+<div id="yDetailTopWrap">
+<div class="topColLft"><div class="gd_imgArea"><span><em>
+<img src="https://image.yes24.com/1.jpg" alt="cover"></em></span></div></div>
+<div class="topColRgt"><div class="gd_infoTop"><div><h2>책 이름?</h2><h3>부제</h3></div>
+<span class="gd_pubArea"><span class="gd_auth"><a>저자</a></span>
+<span class="gd_pub"><a>출판사</a></span></span></div></div></div>
+<div id="infoset_specific"><div class="infoSetCont_wrap"><div><table>
+<tr><th>발행일</th><td>2024년 01월 01일</td></tr>
+<tr><th>쪽수</th><td>320쪽 | 500g</td></tr>
+</table></div></div></div>
+<div id="infoset_toc"><div class="infoSetCont_wrap"><div class="infoWrap_txt">
+1장 처음
+2장 끝
+</div></div></div>
+</body></html>"""
+    result = Yes24ScrapResult.parse(detail_page, "html5lib").to_dict()
+    assert result["page_count"] == 320
+    assert result["contents"] == ["1장 처음", "2장 끝"]
+    assert Yes24ScrapResult.parse(detail_page, "html.parser").to_dict() == result
+
+    fixture = {"url": "https://www.yes24.com/Product/Goods/1", "text": detail_page}
+    (tmp_path / "1.json").write_text(json.dumps(fixture))
+    assert benchmark_yes24_parser(tmp_path)
+
+
+def test_parser_parity_fixtures():
+    from app.script.benchmark_yes24_parser import (
+        benchmark_yes24_parser,
+        fixture_dir,
+        load_fixtures,
+    )
+
+    if not load_fixtures(fixture_dir):
+        pytest.skip("no yes24 fixture page is saved")
+    assert benchmark_yes24_parser(fixture_dir)
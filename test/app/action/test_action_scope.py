@@ -0,0 +1,130 @@
+from typing import Any, Iterable, Optional
+
+import pytest
+
+from app.action.__core__ import Action, ActionScope, get_dependencies
+from app.action.match import CopyEventRelsToTarget, MatchActionBase
+from app.my_block import DatabaseEnum
+from notion_df.entity import Database, Page
+from notion_df.property import (
+    DatabaseProperties,
+    DualRelationDatabasePropertyValue,
+    DualRelationProperty,
+)
+
+database_1 = Database("00000000000000000000000000000001")
+database_2 = Database("00000000000000000000000000000002")
+
+
+class ScopedAction(Action):
+    def __init__(self, scope: Optional[ActionScope]):
+        self.scope = scope
+
+    def get_scope(self) -> Optional[ActionScope]:
+        return self.scope
+
+    def process_pages(self, pages: Iterable[Page]) -> Any:
+        pass
+
+    def process_all(self) -> Any:
+        pass
+
+
+@pytest.fixture
+def schemas(monkeypatch) -> dict[Database, DatabaseProperties]:
+    """the database properties by database, without retrieving them."""
+    schemas: dict[Database, DatabaseProperties] = {}
+    monkeypatch.setattr(
+        Database,
+        "properties",
+        property(lambda self: schemas.setdefault(self, DatabaseProperties())),
+    )
+    return schemas
+
+
+def add_dual_relation(
+    schemas: dict[Database, DatabaseProperties],
+    database_1: Database,
+    prop_name_1: str,
+    database_2: Database,
+    prop_name_2: str,
+) -> None:
+    for database, prop_name, other_database, other_prop_name in [
+        (database_1, prop_name_1, database_2, prop_name_2),
+        (database_2, prop_name_2, database_1, prop_name_1),
+    ]:
+        schemas.setdefault(database, DatabaseProperties())[
+            DualRelationProperty(prop_name)
+        ] = DualRelationDatabasePropertyValue(
+            other_database, DualRelationProperty(other_prop_name)
+        )
+
+
+def test_action_scope_depends_on(schemas):
+    write_title = ActionScope(writes={(database_1, "title")})
+    assert ActionScope(reads={(database_1, None)}).depends_on(write_title)
+    assert ActionScope(writes={(database_1, "title")}).depends_on(write_title)
+    assert not ActionScope(reads={(database_1, "date")}).depends_on(write_title)
+    assert not ActionScope(reads={(database_2, None)}).depends_on(write_title)
+
+
+def test_action_scope_with_synced_writes(schemas):
+    add_dual_relation(schemas, database_1, "to_2", database_2, "to_1")
+    write_relation = ActionScope(writes={(database_1, "to_2")})
+    assert write_relation.with_synced_writes().writes == {
+        (database_1, "to_2"),
+        (database_2, "to_1"),
+    }
+    assert ActionScope(writes={(database_1, None)}).with_synced_writes().writes == {
+        (database_1, None),
+        (database_2, "to_1"),
+    }
+    assert ActionScope(writes={(database_1, "title")}).with_synced_writes().writes == {
+        (database_1, "title")
+    }
+
+
+def test_get_dependencies(schemas):
+    actions = [
+        ScopedAction(ActionScope(writes={(database_1, "title")})),
+        ScopedAction(ActionScope(reads={(database_2, None)})),
+        ScopedAction(ActionScope(reads={(database_1, "title")})),
+        ScopedAction(None),
+    ]
+    assert get_dependencies(actions) == [set(), set(), {0}, {0, 1, 2}]
+
+
+def test_get_dependencies_dual_relation(schemas):
+    add_dual_relation(schemas, database_1, "to_2", database_2, "to_1")
+    actions = [
+        ScopedAction(ActionScope(writes={(database_1, "to_2")})),
+        ScopedAction(ActionScope(reads={(database_2, "to_1")})),
+        ScopedAction(ActionScope(writes={(database_2, "title")})),
+    ]
+    assert get_dependencies(actions) == [set(), {0}, set()]
+
+
+def test_get_dependencies_copy_event_rels_to_target(schemas):
+    doing_db = DatabaseEnum.doing_db.entity
+    reading_db = DatabaseEnum.reading_db.entity
+    add_dual_relation(
+        schemas,
+        doing_db,
+        DatabaseEnum.reading_db.prefix_title,
+        reading_db,
+        DatabaseEnum.doing_db.prefix_title,
+    )
+    base = MatchActionBase()
+    actions = [
+        CopyEventRelsToTarget(base, DatabaseEnum.doing_db),
+        CopyEventRelsToTarget(base, DatabaseEnum.reading_db),
+    ]
+    # copying to the doing page also changes the synced relation on the reading page
+    assert get_dependencies(actions) == [set(), {0}]
+
+
+def test_routine_action_scope():
+    from app.action.__routine__ import routine_action
+
+    # otherwise, every run searches the whole workspace for the edited pages
+    assert routine_action.get_scope() is not None
@@ -0,0 +1,126 @@
+import datetime as dt
+from types import SimpleNamespace
+from typing import Optional
+
+from app.action.match import (
+    DateINamespace,
+    MatchActionBase,
+    MatchRecordDateiByCreatedTime,
+)
+from app.my_block import DatabaseEnum, datei_date_prop
+from notion_df.entity import Database
+from notion_df.rich_text import RichText
+
+
+class FakeProperties(dict):
+    def __init__(self, title: str, date: Optional[dt.date]):
+        super().__init__(
+            {datei_date_prop: SimpleNamespace(start=date) if date else None}
+        )
+        self.title = RichText.from_plain_text(title)
+
+
+def test_date_namespace_preload(monkeypatch):
+    namespace = DateINamespace(preload_window=dt.timedelta(days=1))
+    today = dt.date(2024, 1, 10)
+    queries = []
+    title_queries = []
+    created_dates = []
+
+    def query(self, filter_=None, *args, **kwargs):
+        if kwargs.get("limit") == 1:
+            title_queries.append(filter_)
+            return []
+        queries.append(filter_)
+        return [
+            SimpleNamespace(properties=FakeProperties(namespace.get_title(date), date))
+            for date in [today - dt.timedelta(days=1), today]
+        ]
+
+    def create_page(title_plain_text: str, date: dt.date):
+        created_dates.append(date)
+        page = SimpleNamespace(properties=FakeProperties(title_plain_text, date))
+        namespace._index_page(page)
+        return page
+
+    monkeypatch.setattr(Database, "query", query)
+    monkeypatch.setattr(namespace, "create_page", create_page)
+
+    assert namespace.get_page_by_date(today) is namespace.pages_by_date[today]
+    assert len(queries) == 1
+    pages = namespace.get_pages_by_dates(
+        [today - dt.timedelta(days=1), today + dt.timedelta(days=1)]
+    )
+    assert len(queries) == 1
+    # the page missing in the preloaded window is looked up by title before creation
+    assert len(title_queries) == 1
+    assert created_dates == [today + dt.timedelta(days=1)]
+    assert pages[today + dt.timedelta(days=1)] is namespace.get_page_by_date(
+        today + dt.timedelta(days=1)
+    )
+
+
+def test_date_namespace_undated_page(monkeypatch):
+    namespace = DateINamespace(preload_window=dt.timedelta(days=1))
+    today = dt.date(2024, 1, 10)
+    # manually created, with empty date. the preload does not match it by the date filter.
+    undated_page = SimpleNamespace(
+        properties=FakeProperties(namespace.get_title(today), None)
+    )
+    other_undated_page = SimpleNamespace(properties=FakeProperties("memo", None))
+
+    def query(self, filter_=None, *args, **kwargs):
+        if kwargs.get("limit") == 1:
+            return [undated_page]
+        return [other_undated_page]
+
+    def create_page(title_plain_text: str, date: dt.date):
+        raise AssertionError("should not create a duplicate")
+
+    monkeypatch.setattr(Database, "query", query)
+    monkeypatch.setattr(namespace, "create_page", create_page)
+
+    assert namespace.get_page_by_date(today) is undated_page
+    assert namespace.pages_by_date == {}
+
+
+def test_match_record_datei_by_created_time_prepare(monkeypatch):
+    action = MatchRecordDateiByCreatedTime(
+        MatchActionBase(),
+        DatabaseEnum.event_db,
+        DatabaseEnum.datei_db.title,
+        only_if_empty=True,
+    )
+    record_to_datei = action.record_to_datei
+    datei = SimpleNamespace()
+    records = [
+        SimpleNamespace(
+            parent=action.record_db,
+            properties={record_to_datei: []},
+            created_time=dt.datetime(2024, 1, 10, 12),
+        ),
+        # before 5 AM, regarded as the previous day
+        SimpleNamespace(
+            parent=action.record_db,
+            properties={record_to_datei: []},
+            created_time=dt.datetime(2024, 1, 10, 3),
+        ),
+        SimpleNamespace(
+            parent=action.record_db,
+            properties={record_to_datei: [datei]},
+            created_time=dt.datetime(2024, 1, 1, 12),
+        ),
+        SimpleNamespace(
+            parent=Database("00000000000000000000000000000001"),
+            properties={},
+            created_time=dt.datetime(2024, 1, 2, 12),
+        ),
+    ]
+    requested_dates = []
+    monkeypatch.setattr(
+        action.date_namespace,
+        "get_pages_by_dates",
+        lambda dates, max_workers: requested_dates.append(set(dates)),
+    )
+    action.prepare(records)
+    assert requested_dates == [{dt.date(2024, 1, 10), dt.date(2024, 1, 9)}]
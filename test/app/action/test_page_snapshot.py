@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+from typing import Optional
+
+import pytest
+
+from app.action.__core__ import ActionScope, PageSnapshot
+from notion_df.entity import Database, Page
+from notion_df.property import RelationPagePropertyValue, RelationProperty
+
+database_1 = Database("00000000000000000000000000000001")
+database_2 = Database("00000000000000000000000000000002")
+relation_prop = RelationProperty("relation")
+
+
+class FakePage:
+    def __init__(self, parent: Database, timestamp: Optional[int] = 0):
+        self.parent = parent
+        self.local_data = None
+        if timestamp is not None:
+            self.set_data(timestamp)
+
+    def set_data(self, timestamp: int, *linked_pages: "FakePage") -> None:
+        properties = {relation_prop: RelationPagePropertyValue(linked_pages)}
+        self.local_data = SimpleNamespace(properties=properties, timestamp=timestamp)
+
+
+@pytest.fixture
+def retrieved_pages(monkeypatch) -> list[FakePage]:
+    retrieved_pages = []
+
+    def retrieve(page: FakePage) -> FakePage:
+        retrieved_pages.append(page)
+        page.set_data(100)
+        return page
+
+    monkeypatch.setattr(Page, "retrieve", retrieve)
+    return retrieved_pages
+
+
+def test_page_snapshot_view(retrieved_pages):
+    page_1 = FakePage(database_1)
+    page_2 = FakePage(database_2, timestamp=None)
+    snapshot = PageSnapshot([page_1, page_2, page_1], max_workers=2)
+    # only the pages without data are retrieved at first
+    assert retrieved_pages == [page_2]
+
+    assert snapshot.view(None) == [page_1, page_2]
+    assert snapshot.view(ActionScope(reads={(database_1, "title")})) == [page_1]
+    assert snapshot.view(ActionScope(writes={(database_2, None)})) == [page_2]
+    assert snapshot.view(ActionScope()) == []
+
+
+def test_page_snapshot_refresh(retrieved_pages):
+    page_1 = FakePage(database_1, timestamp=10)
+    page_2 = FakePage(database_2, timestamp=10)
+    page_3 = FakePage(database_2, timestamp=30)
+    snapshot = PageSnapshot([page_1, page_2, page_3], max_workers=2)
+    assert snapshot.view(None) == [page_1, page_2, page_3]
+
+    # an earlier action updated page_1, which changed the other side of the dual relations
+    page_1.set_data(20, page_2, page_3)
+    snapshot.view(ActionScope(reads={(database_2, None)}))
+    # page_3 is newer than the update, so it is not stale
+    assert retrieved_pages == [page_2]
+
+    snapshot.view(None)
+    assert retrieved_pages == [page_2]
@@ -0,0 +1,46 @@
+from typing import Any, Iterable, Iterator
+
+from app.action.__core__ import SequentialAction
+
+
+class RecordingAction(SequentialAction):
+    prepare_chunk_size = 2
+
+    def __init__(self):
+        self.events = []
+
+    def query(self) -> Iterable[Any]:
+        return []
+
+    def prepare(self, pages: list[Any]) -> None:
+        self.events.append(("prepare", pages))
+
+    def process_page(self, page: Any) -> None:
+        self.events.append(("process", page))
+
+
+def test_sequential_action_prepare_chunks():
+    action = RecordingAction()
+
+    def stream() -> Iterator[int]:
+        for page in range(5):
+            action.events.append(("pull", page))
+            yield page
+
+    action.process_pages(stream())
+    # the pages are pulled by chunk, not all at once
+    assert action.events == [
+        ("pull", 0),
+        ("pull", 1),
+        ("prepare", [0, 1]),
+        ("process", 0),
+        ("process", 1),
+        ("pull", 2),
+        ("pull", 3),
+        ("prepare", [2, 3]),
+        ("process", 2),
+        ("process", 3),
+        ("pull", 4),
+        ("prepare", [4]),
+        ("process", 4),
+    ]
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.routine.main import AdaptiveInterval, RoutineScheduler
+from notion_df.core.data_core import real_data_dict
+
+
+def test_adaptive_interval():
+    interval = AdaptiveInterval(
+        min_interval=timedelta(seconds=5),
+        max_interval=timedelta(seconds=30),
+        failure_interval=timedelta(minutes=10),
+    )
+    assert [interval.on_idle() for _ in range(4)] == [
+        timedelta(seconds=10),
+        timedelta(seconds=20),
+        timedelta(seconds=30),
+        timedelta(seconds=30),
+    ]
+    assert interval.on_failure() == timedelta(minutes=10)
+    # the failure keeps the idle interval
+    assert interval.on_idle() == timedelta(seconds=30)
+    assert interval.on_busy() == timedelta(seconds=5)
+    assert interval.on_idle() == timedelta(seconds=10)
+
+
+class StopLoop(Exception):
+    pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2024, 1, 1)
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += timedelta(seconds=seconds)
+        if len(self.sleeps) == 4:
+            raise StopLoop
+
+
+class FakeAction:
+    def __init__(self, results: list):
+        self.results = results
+
+    def run_from_last_success(self, update_last_success_time: bool):
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_routine_scheduler_run_forever():
+    clock = FakeClock()
+    scheduler = RoutineScheduler(
+        AdaptiveInterval(min_interval=timedelta(seconds=5)),
+        cache_lifetime=timedelta(seconds=12),
+        action=FakeAction([None, None, RuntimeError("failed"), "done"]),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    real_data_dict["sentinel"] = None
+    with pytest.raises(StopLoop):
+        scheduler.run_forever()
+    # idle, idle, failure, busy
+    assert clock.sleeps == [10, 20, 600, 5]
+    # cleared at the third cycle (30s after the start) and the fourth (630s)
+    assert "sentinel" not in real_data_dict
+    assert scheduler.cache_created_time == datetime(2024, 1, 1, 0, 10, 30)
+
+
+def test_routine_scheduler_keeps_cache():
+    clock = FakeClock()
+    scheduler = RoutineScheduler(
+        AdaptiveInterval(),
+        cache_lifetime=timedelta(hours=6),
+        action=FakeAction(["done"]),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    real_data_dict["sentinel"] = None
+    try:
+        assert scheduler.run_cycle() == timedelta(seconds=5)
+        assert "sentinel" in real_data_dict
+    finally:
+        real_data_dict.pop("sentinel", None)
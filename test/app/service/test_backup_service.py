@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+
+from app.service.backup_service import (
+    Fingerprint,
+    ResponseBackupService,
+    SQLiteBackupService,
+)
+
+
+@pytest.mark.parametrize(
+    "backup_cls",
+    [
+        ResponseBackupService,
+        SQLiteBackupService,
+        lambda root: SQLiteBackupService(root, compress=False),
+    ],
+)
+def test_backup_service(tmp_path, backup_cls):
+    backup = backup_cls(tmp_path)
+    entity = SimpleNamespace(id=UUID(int=1), data=SimpleNamespace(raw={"a": "가"}))
+    assert backup._read_raw(entity) is None
+    assert not backup._write_raw(entity, {"a": "가"})
+    backup.write(entity)
+    assert backup._read_raw(entity) == {"a": "가"}
+
+
+@pytest.mark.parametrize("backup_cls", [ResponseBackupService, SQLiteBackupService])
+def test_backup_service_skip_unchanged(tmp_path, backup_cls):
+    entity = SimpleNamespace(
+        id=UUID(int=1), data=SimpleNamespace(raw={"last_edited_time": "t1", "a": 1})
+    )
+    backup = backup_cls(tmp_path)
+    backup.write(entity)
+    backup.write(entity)
+    entity.data.raw = {"last_edited_time": "t1", "a": 2}
+    backup.write(entity)
+    assert backup.counter == {"created": 1, "unchanged": 1, "overwritten": 1}
+
+    # the fingerprints persist
+    reopened = backup_cls(tmp_path)
+    assert reopened.is_unchanged(entity, Fingerprint.of(entity.data.raw))
+    assert not reopened.is_unchanged(entity, Fingerprint.of({"last_edited_time": "t2"}))
+
+
+def test_backup_service_read_cache(tmp_path):
+    backup = ResponseBackupService(tmp_path, cache_size=1)
+    page_id = UUID(int=2)
+    raw = {
+        "parent": {"type": "database_id", "database_id": str(UUID(int=3))},
+        "properties": {
+            "title": {"type": "title", "title": []},
+            "link": {"type": "relation", "relation": [{"id": str(page_id)}]},
+        },
+    }
+    entity = SimpleNamespace(id=UUID(int=1), data=SimpleNamespace(raw=raw))
+    other = SimpleNamespace(id=UUID(int=4))
+    read_count = 0
+    _read_raw = backup._read_raw
+
+    def read_raw(entity):
+        nonlocal read_count
+        read_count += 1
+        return _read_raw(entity)
+
+    backup._read_raw = read_raw
+    assert backup.read_summary(entity) is None
+    assert backup.read_summary(entity) is None
+    assert read_count == 1
+
+    backup.write(entity)
+    summary = backup.read_summary(entity)
+    assert summary == backup.read_summary(entity)
+    assert summary.parent.id == UUID(int=3)
+    assert summary.relation_ids == {"link": [page_id]}
+    assert read_count == 2
+
+    backup.read_summary(other)
+    backup.read_summary(entity)
+    assert read_count == 4
+
+
+@pytest.mark.parametrize("backup_cls", [ResponseBackupService, SQLiteBackupService])
+def test_backup_service_read_cache_across_instances(tmp_path, backup_cls):
+    def get_raw(database_id: UUID) -> dict:
+        return {
+            "parent": {"type": "database_id", "database_id": str(database_id)},
+            "properties": {},
+        }
+
+    entity = SimpleNamespace(
+        id=UUID(int=1), data=SimpleNamespace(raw=get_raw(UUID(int=2)))
+    )
+    writer, reader = backup_cls(tmp_path), backup_cls(tmp_path)
+    writer.write(entity)
+    assert reader.read_summary(entity).parent.id == UUID(int=2)
+
+    entity.data.raw = get_raw(UUID(int=3))
+    writer.write(entity)
+    assert reader.read_summary(entity).parent.id == UUID(int=3)
@@ -0,0 +1,59 @@
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pytest
+
+from app.service.change_detection_service import ChangeDetectionService
+from notion_df.entity import Database, Workspace
+
+database_1 = Database("00000000000000000000000000000001")
+database_2 = Database("00000000000000000000000000000002")
+database_3 = Database("00000000000000000000000000000003")
+
+
+@dataclass(frozen=True)
+class FakePage:
+    name: str
+    parent: Optional[Database] = field(default=None, compare=False)
+    last_edited_time: Optional[datetime] = field(default=None, compare=False)
+
+
+@pytest.fixture
+def searches(monkeypatch) -> list[str]:
+    pages_by_database = {
+        database_1: [FakePage("page_1")],
+        database_2: [FakePage("page_2")],
+    }
+    search_result = [
+        FakePage("page_3", parent=database_3, last_edited_time=datetime(2024, 1, 3)),
+        FakePage("page_1", parent=database_1, last_edited_time=datetime(2024, 1, 2)),
+        FakePage("page_4", parent=database_3, last_edited_time=datetime(2023, 12, 31)),
+    ]
+    searches = []
+
+    def query(self, filter_=None, *args, **kwargs):
+        return pages_by_database[self]
+
+    def search_by_title(query, entity=None, *args, **kwargs):
+        searches.append(query)
+        return iter(search_result)
+
+    monkeypatch.setattr(Database, "query", query)
+    monkeypatch.setattr(Workspace, "search_by_title", staticmethod(search_by_title))
+    return searches
+
+
+def test_change_detection_service_find(searches):
+    service = ChangeDetectionService([database_1, database_2])
+    pages = service.find(datetime(2024, 1, 1))
+    assert {page.name for page in pages} == {"page_1", "page_2"}
+    assert searches == []
+
+
+def test_change_detection_service_search_outside(searches):
+    service = ChangeDetectionService([database_1, database_2], search_outside=True)
+    pages = service.find(datetime(2024, 1, 1))
+    # page_1 is found by the query, and page_4 is before the lower bound
+    assert {page.name for page in pages} == {"page_1", "page_2", "page_3"}
+    assert searches == [""]
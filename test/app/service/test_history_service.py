@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from app.service.history_service import HistoryService, apply_delta, get_delta
+
+
+def test_delta():
+    old = {"a": 1, "b": 2, "properties": {"x": {"v": 1}, "y": {"v": 2}}}
+    new = {"a": 1, "c": 3, "properties": {"x": {"v": 1}, "y": {"v": 3}}}
+    delta = get_delta(old, new)
+    assert delta == {
+        "set": {"c": 3},
+        "unset": ["b"],
+        "properties": {"set": {"y": {"v": 3}}},
+    }
+    assert apply_delta(old, delta) == new
+    assert get_delta(new, new) == {}
+
+
+def test_history_service(tmp_path):
+    history = HistoryService(tmp_path, base_interval=timedelta(days=2))
+    page_id = UUID(int=1)
+    db_id, other_db_id = UUID(int=2), UUID(int=3)
+    t0 = datetime(2024, 1, 1)
+
+    def get_raw(value: int, database_id: UUID) -> dict:
+        return {
+            "id": str(page_id),
+            "parent": {"type": "database_id", "database_id": str(database_id)},
+            "properties": {"value": {"type": "number", "number": value}},
+        }
+
+    assert history.record(get_raw(0, db_id), t0)
+    assert not history.record(get_raw(0, db_id), t0 + timedelta(days=1))
+    assert history.record(get_raw(1, db_id), t0 + timedelta(days=1))
+    assert history.record(get_raw(2, other_db_id), t0 + timedelta(days=3))
+    rows = history._connect().execute("SELECT is_base FROM revision ORDER BY time")
+    assert [is_base for (is_base,) in rows] == [1, 0, 1]
+
+    assert history.restore(page_id, t0 - timedelta(days=1)) is None
+    assert history.restore(page_id, t0 + timedelta(hours=1)) == get_raw(0, db_id)
+    assert history.restore(page_id, t0 + timedelta(days=2)) == get_raw(1, db_id)
+    assert history.restore_database(db_id, t0 + timedelta(days=2)) == {
+        page_id: get_raw(1, db_id)
+    }
+    assert history.restore_database(db_id, t0 + timedelta(days=4)) == {}
+    assert history.restore_database(other_db_id, t0 + timedelta(days=4)) == {
+        page_id: get_raw(2, other_db_id)
+    }
+    history.close()
@@ -0,0 +1,41 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.service.http_cache_service import CacheMissError, HTTPCacheService
+
+
+class FakeSession:
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers, timeout):
+        self.requests.append((url, headers))
+        if url.endswith("etag"):
+            if headers.get("If-None-Match") == '"1"':
+                return SimpleNamespace(status_code=304, ok=False, text="", headers={})
+            return SimpleNamespace(
+                status_code=200, ok=True, text="etag body", headers={"ETag": '"1"'}
+            )
+        return SimpleNamespace(status_code=200, ok=True, text="body", headers={})
+
+
+def test_http_cache_service(tmp_path):
+    session = FakeSession()
+    cache = HTTPCacheService(tmp_path, timedelta(days=1), session=session)
+    assert cache.get("https://a/etag") == "etag body"
+    assert cache.get("https://a/etag") == "etag body"
+    assert session.requests[-1] == ("https://a/etag", {"If-None-Match": '"1"'})
+    assert cache.get("https://a/ttl") == "body"
+    assert cache.get("https://a/ttl") == "body"
+    assert len(session.requests) == 3
+
+    expired = HTTPCacheService(tmp_path, timedelta(0), session=session)
+    assert expired.get("https://a/ttl") == "body"
+    assert len(session.requests) == 4
+
+    offline = HTTPCacheService(tmp_path, offline=True, session=None)
+    assert offline.get("https://a/etag") == "etag body"
+    with pytest.raises(CacheMissError):
+        offline.get("https://a/unknown")
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+from uuid import UUID
+
+from app.service.template_service import TemplateService
+from notion_df.entity import Database, Page
+from notion_df.rich_text import RichText
+
+
+def test_template_service(monkeypatch):
+    database = Database(UUID(int=1))
+    titles = {
+        Page(UUID(int=2)): "<일간> (template)",
+        Page(UUID(int=3)): "240101 월요일",
+    }
+
+    def page_data(self: Page) -> SimpleNamespace:
+        return SimpleNamespace(
+            parent=database,
+            properties=SimpleNamespace(title=RichText.from_plain_text(titles[self])),
+        )
+
+    monkeypatch.setattr(Page, "data", property(page_data))
+    monkeypatch.setattr(
+        Database,
+        "data",
+        property(lambda self: SimpleNamespace(title=RichText.from_plain_text("일간"))),
+    )
+    service = TemplateService()
+    assert list(service.filter(titles)) == [Page(UUID(int=3))]
+    assert list(service._pattern_by_title) == ["일간"]
@@ -0,0 +1,41 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.service.webdriver_service import WebDriverPool
+
+
+def test_webdriver_pool():
+    created, quit_drivers = [], []
+
+    def create():
+        driver = SimpleNamespace(quit=lambda: quit_drivers.append(driver))
+        created.append(driver)
+        return driver
+
+    service = SimpleNamespace(create=create)
+    barrier = threading.Barrier(2)
+    with WebDriverPool(service, 2) as pool:
+
+        def use():
+            with pool.acquire():
+                barrier.wait(timeout=5)
+
+        threads = [threading.Thread(target=use) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(created) == 2
+
+        # reused
+        with pool.acquire() as driver:
+            assert driver in created
+        assert len(created) == 2
+
+        # dropped on failure
+        with pytest.raises(ValueError), pool.acquire() as driver:
+            raise ValueError
+        assert quit_drivers == [driver]
+    assert set(map(id, quit_drivers)) == set(map(id, created))
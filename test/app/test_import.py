@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+from app import project_dir
+
+_check_import = """
+import socket
+import sys
+
+
+def _block_network(*args, **kwargs):
+    raise RuntimeError("network access on import")
+
+
+socket.socket.connect = _block_network
+socket.create_connection = _block_network
+
+import app.action.__routine__
+
+assert "selenium" not in sys.modules
+"""
+
+
+def test_import_is_offline():
+    subprocess.run([sys.executable, "-c", _check_import], cwd=project_dir, check=True)
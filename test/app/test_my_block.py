@@ -0,0 +1,15 @@
+from app.my_block import DatabaseEnum
+from notion_df.entity import Database
+from notion_df.rich_text import RichText
+
+
+def test_prefix_title(monkeypatch):
+    # from the preview data, without a request
+    assert DatabaseEnum.datei_db.prefix_title == DatabaseEnum.datei_db.prefix + "일간"
+
+    monkeypatch.setattr(
+        Database, "title", property(lambda self: RichText.from_plain_text("renamed"))
+    )
+    assert (
+        DatabaseEnum.datei_db.prefix_title == DatabaseEnum.datei_db.prefix + "renamed"
+    )
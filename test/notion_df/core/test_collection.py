@@ -21,3 +21,36 @@ def test_coalesce_dataclass():
     instance2 = ExampleDataClass(field1=None, field2="Hello", field3=None)
     coalesce_dataclass(instance1, instance2)
     assert instance1 == ExampleDataClass(field1=1, field2="Hello", field3=2.5)
+
+
+def test_paginator_stream():
+    p = Paginator(int, iter(range(7)))
+    p._fetch_until(1)
+    s = p.stream(window=2)
+    assert p._values == []
+    assert list(s.chunks(3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert s.window == (5, 6)
+
+
+def test_paginator_page_size_hint():
+    page_sizes = []
+
+    def fetch(get_page_size_hint):
+        start = 0
+        while start < 250:
+            page_size = get_page_size_hint() or 100
+            page_sizes.append(page_size)
+            yield from range(start, min(start + page_size, 250))
+            start += page_size
+
+    p = Paginator.from_requests(int, fetch)
+    assert p
+    assert p[:5] == [0, 1, 2, 3, 4]
+    assert page_sizes == [1, 4]
+    assert len(p) == 250
+    assert page_sizes == [1, 4, 100, 100, 100]
+
+    page_sizes.clear()
+    p = Paginator.from_requests(int, fetch, limit=3)
+    assert list(p) == [0, 1, 2]
+    assert page_sizes == [3]
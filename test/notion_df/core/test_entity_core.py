@@ -0,0 +1,33 @@
+from notion_df.core.entity_core import retrieval_tracker, retrieve_on_demand
+from notion_df.core.misc import undefined
+
+
+class FakeEntity:
+    def __init__(self):
+        self.local_value = undefined
+
+    @retrieve_on_demand
+    def value(self):
+        return self.local_value
+
+    def retrieve(self):
+        self.local_value = 1
+
+
+def test_retrieval_tracker(monkeypatch):
+    monkeypatch.setattr(retrieval_tracker, "threshold", 2)
+    with retrieval_tracker.track():
+        for _ in range(3):
+            assert FakeEntity().value() == 1
+        FakeEntity().value()
+        entity = FakeEntity()
+        entity.value()
+        entity.value()  # not retrieved again
+        ((call_site, entity_cls_name, attr_name), count), *others = (
+            retrieval_tracker.get_flagged()
+        )
+    assert not others
+    assert call_site.startswith(__file__) and "test_retrieval_tracker" in call_site
+    assert (entity_cls_name, attr_name, count) == ("FakeEntity", "value", 3)
+    assert sum(retrieval_tracker.counter.values()) == 5
+    assert not retrieval_tracker.enabled
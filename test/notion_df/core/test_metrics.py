@@ -0,0 +1,86 @@
+import json
+from types import SimpleNamespace
+
+from notion_df.core.metrics import (
+    ContextThreadPoolExecutor,
+    RequestMetrics,
+    attribute,
+    current_action,
+    get_path_template,
+)
+
+
+def test_get_path_template():
+    assert (
+        get_path_template("pages/0a1b2c3d4e5f60718293a4b5c6d7e8f9/properties/%3AbC")
+        == "pages/{id}/properties/{property_id}"
+    )
+    assert (
+        get_path_template("/blocks/0a1b2c3d-4e5f-6071-8293-a4b5c6d7e8f9/children")
+        == "blocks/{id}/children"
+    )
+    assert get_path_template("search") == "search"
+
+
+def test_request_metrics():
+    metrics = RequestMetrics()
+    with attribute("MyAction"):
+        metrics.record(
+            "GET", "pages/0a1b2c3d4e5f60718293a4b5c6d7e8f9", "200", 0.2, 10, 0, 0
+        )
+        with ContextThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(
+                metrics.record_retry, "GET", "pages/0a1b2c3d4e5f60718293a4b5c6d7e8f9"
+            ).result()
+            assert executor.submit(current_action.get).result() == "MyAction"
+    metrics.record(
+        "PATCH", "pages/0a1b2c3d4e5f60718293a4b5c6d7e8f9", "error", 100, 0, 5, 0.5
+    )
+
+    snapshot = metrics.snapshot()
+    assert [(e["action"], e["method"], e["path"]) for e in snapshot] == [
+        ("", "PATCH", "pages/{id}"),
+        ("MyAction", "GET", "pages/{id}"),
+    ]
+    patch, get = snapshot
+    assert get["count"] == 1 and get["retries"] == 1 and get["bytes_in"] == 10
+    assert get["latency_buckets"]["0.1"] == 0 and get["latency_buckets"]["0.25"] == 1
+    assert patch["latency_buckets"]["80"] == 0 and patch["latency_buckets"]["+Inf"] == 1
+    assert patch["status_codes"] == {"error": 1} and patch["rate_limit_wait"] == 0.5
+    assert json.loads(metrics.to_json()) == snapshot
+
+    prometheus = metrics.to_prometheus()
+    assert (
+        'notion_df_requests_total{action="MyAction",method="GET",path="pages/{id}",status="200"} 1'
+        in prometheus
+    )
+    assert (
+        'notion_df_request_duration_seconds_bucket{action="",method="PATCH",path="pages/{id}",le="+Inf"} 1'
+        in prometheus
+    )
+    # each family is contiguous after its TYPE line
+    families = []
+    for line in prometheus.splitlines():
+        if line.startswith("# TYPE "):
+            families.append(line.split()[2])
+        else:
+            assert line.startswith(families[-1])
+    assert len(families) == len(set(families)) == 6
+
+
+def test_request_metrics_track(monkeypatch):
+    metrics = RequestMetrics()
+    messages = []
+    monkeypatch.setattr(
+        "notion_df.core.metrics.logger",
+        SimpleNamespace(info=messages.append, debug=messages.append),
+    )
+    metrics.record("GET", "search", "200", 0.2, 10, 0, 0)
+    with metrics.track():
+        metrics.record("GET", "search", "200", 0.4, 10, 0, 1.5)
+        metrics.record_retry("GET", "search")
+    assert messages == [
+        "GET search : 1 requests, 1 retries, 0.400s mean latency",
+        "1 requests, 1 retries, 1.5s waited for the rate limit",
+    ]
+    assert metrics.snapshot()[0]["count"] == 2
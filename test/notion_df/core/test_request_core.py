@@ -0,0 +1,34 @@
+from types import SimpleNamespace
+
+from notion_df.core.request_core import RateLimiter
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=100, burst=2)
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    assert 0 < limiter.acquire() <= 0.01
+
+
+def test_request_metrics(monkeypatch):
+    from notion_df.core import request_core
+    from notion_df.core.metrics import RequestMetrics, attribute
+    from notion_df.core.request_core import Method, Request, Version
+
+    response = SimpleNamespace(
+        status_code=200,
+        content=b"{}",
+        request=SimpleNamespace(body=b"{}"),
+        raise_for_status=lambda: None,
+    )
+    monkeypatch.setattr(
+        request_core,
+        "get_session",
+        lambda: SimpleNamespace(request=lambda **kwargs: response),
+    )
+    monkeypatch.setattr(request_core, "request_metrics", metrics := RequestMetrics())
+    with attribute("MyAction"):
+        Request("token", Method.GET, Version.v20220628, "pages/a", None, None).execute()
+    (endpoint,) = metrics.snapshot()
+    assert endpoint["action"] == "MyAction" and endpoint["path"] == "pages/a"
+    assert endpoint["status_codes"] == {"200": 1} and endpoint["bytes_out"] == 2
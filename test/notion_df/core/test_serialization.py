@@ -11,3 +11,10 @@ def test_serde_datetime():
     assert deserialize_datetime("2023-01-01T00:00:00+09:00") == datetime(
         2023, 1, 1, tzinfo=my_tz
     )
+    assert deserialize_datetime("2023-01-01T00:00:00.000Z") == datetime(
+        2023, 1, 1, 9, tzinfo=my_tz
+    )
+    # not ISO 8601, parsed by the fallback
+    assert deserialize_datetime("Jan 1 2023 00:00 +0900") == datetime(
+        2023, 1, 1, tzinfo=my_tz
+    )
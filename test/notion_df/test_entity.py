@@ -0,0 +1,327 @@
+import threading
+from types import SimpleNamespace
+from uuid import UUID
+
+import pytest
+
+from notion_df.core.collection import Paginator
+from notion_df.entity import Block, Page
+
+
+def _block(i: int) -> Block:
+    return Block(UUID(int=i))
+
+
+def _page(i: int) -> Page:
+    return Page(UUID(int=i))
+
+
+def test_retrieve_tree(monkeypatch):
+    # 1 -> [2 -> [4, 5], 3]
+    children = {1: [2, 3], 2: [4, 5]}
+    monkeypatch.setattr(
+        Block, "has_children", property(lambda self: self.id.int in children)
+    )
+    monkeypatch.setattr(Block, "contents", property(lambda self: None))
+    monkeypatch.setattr(
+        Block,
+        "retrieve_children",
+        lambda self: Paginator(Block, iter(map(_block, children.get(self.id.int, [])))),
+    )
+
+    tree = _block(1).retrieve_tree()
+    assert sorted(node.block.id.int for node in tree) == [2, 3, 4, 5]
+    root = tree.fetch_all()
+    assert [node.block.id.int for node in root.walk()] == [1, 2, 4, 5, 3]
+    node_4 = root.children[0].children[0]
+    assert node_4.parent.block == _block(2)
+    assert node_4.depth == 2
+
+    root = _block(1).retrieve_tree(max_depth=1).fetch_all()
+    assert [node.block.id.int for node in root.walk()] == [1, 2, 3]
+
+
+def test_append_children(monkeypatch):
+    from notion_df.contents import NestedBlockContents, DividerBlockContents
+    from notion_df.request.block import AppendBlockChildren
+
+    requests = []
+    lock = threading.Lock()
+
+    def execute(self: AppendBlockChildren) -> list[SimpleNamespace]:
+        with lock:
+            requests.append((self.id, len(self.children)))
+            start = len(requests) * 1000
+        return [
+            SimpleNamespace(id=UUID(int=start + i)) for i in range(len(self.children))
+        ]
+
+    monkeypatch.setattr(AppendBlockChildren, "execute", execute)
+    children = [
+        NestedBlockContents(DividerBlockContents(), [DividerBlockContents()] * 150),
+        *([DividerBlockContents()] * 200),
+    ]
+    blocks = _block(1).append_children(children)
+    assert len(blocks) == 201
+    assert sorted(requests, key=lambda request: request[0].int) == [
+        (UUID(int=1), 100),
+        (UUID(int=1), 100),
+        (UUID(int=1), 1),
+        (blocks[0].id, 100),
+        (blocks[0].id, 50),
+    ]
+
+
+@pytest.fixture
+def relation_links(monkeypatch) -> SimpleNamespace:
+    """a dual relation between a hub page and 200 record pages, on the fake API."""
+    from notion_df.entity import Database, Page
+    from notion_df.property import (
+        DatabaseProperties,
+        DualRelationDatabasePropertyValue,
+        DualRelationProperty,
+    )
+    from notion_df.request.page import UpdatePage
+
+    hub_db, record_db = Database(UUID(int=1)), Database(UUID(int=2))
+    hub_prop, record_prop = DualRelationProperty("records"), DualRelationProperty("hub")
+    database_properties = {
+        hub_db: DatabaseProperties(
+            {hub_prop: DualRelationDatabasePropertyValue(record_db, record_prop)}
+        ),
+        record_db: DatabaseProperties(
+            {record_prop: DualRelationDatabasePropertyValue(hub_db, hub_prop)}
+        ),
+    }
+    hub = Page(UUID(int=100))
+    links: set[tuple[Page, Page]] = set()
+    """(hub, record)"""
+    updated_pages: list[Page] = []
+    lock = threading.Lock()
+
+    def execute(self: UpdatePage) -> None:
+        page = Page(self.id)
+        for prop, prop_value in self.properties.items():
+            assert len(prop_value) <= 100
+            with lock:
+                updated_pages.append(page)
+                if prop.name == "records":
+                    links.difference_update({link for link in links if link[0] == page})
+                    links.update((page, record) for record in prop_value)
+                else:
+                    links.difference_update({link for link in links if link[1] == page})
+                    links.update((_hub, page) for _hub in prop_value)
+
+    def retrieve_property_item(self: Page, prop: DualRelationProperty):
+        with lock:
+            if prop.name == "records":
+                return prop.page_value(record for _hub, record in links if _hub == self)
+            return prop.page_value(_hub for _hub, record in links if record == self)
+
+    monkeypatch.setattr(UpdatePage, "execute", execute)
+    monkeypatch.setattr(Page, "retrieve_property_item", retrieve_property_item)
+    monkeypatch.setattr(
+        Page, "parent", property(lambda self: hub_db if self == hub else record_db)
+    )
+    monkeypatch.setattr(
+        Database, "properties", property(lambda self: database_properties[self])
+    )
+    return SimpleNamespace(
+        hub=hub,
+        hub_prop=hub_prop,
+        records=[Page(UUID(int=1000 + i)) for i in range(200)],
+        links=links,
+        updated_pages=updated_pages,
+    )
+
+
+def test_update_excess_relation(relation_links):
+    from notion_df.property import PageProperties
+
+    hub, hub_prop, records = (
+        relation_links.hub,
+        relation_links.hub_prop,
+        relation_links.records[:150],
+    )
+    relation_links.links.update((hub, record) for record in records[:10])
+    relation_links.links.add((hub, relation_links.records[199]))
+
+    hub.update(PageProperties({hub_prop: hub_prop.page_value(records)}))
+    assert relation_links.links == {(hub, record) for record in records}
+    # the hub writes 100 pages at once, and the remaining 50 are written from their side
+    assert relation_links.updated_pages.count(hub) == 1
+    assert len(relation_links.updated_pages) == 51
+
+
+def test_update_excess_relation_keeps_existing_links(relation_links):
+    from notion_df.property import PageProperties
+
+    hub, hub_prop, records = (
+        relation_links.hub,
+        relation_links.hub_prop,
+        relation_links.records,
+    )
+    relation_links.links.update((hub, record) for record in records[:120])
+
+    hub.update(PageProperties({hub_prop: hub_prop.page_value(records[:150])}))
+    assert relation_links.links == {(hub, record) for record in records[:150]}
+    # only the 30 new pages are written, since the hub cannot hold 120 pages in a write
+    assert hub not in relation_links.updated_pages
+    assert sorted(page.id.int for page in relation_links.updated_pages) == [
+        record.id.int for record in records[120:150]
+    ]
+
+
+def test_update_excess_relation_both_sides_exceed(relation_links):
+    from notion_df.core.exception import RelationLimitError
+    from notion_df.entity import Page
+    from notion_df.property import PageProperties
+
+    hub, hub_prop, records = (
+        relation_links.hub,
+        relation_links.hub_prop,
+        relation_links.records,
+    )
+    relation_links.links.update((hub, record) for record in records[:120])
+    # the new record is already linked to 100 other hubs
+    relation_links.links.update(
+        (Page(UUID(int=10000 + i)), records[120]) for i in range(100)
+    )
+
+    with pytest.raises(RelationLimitError):
+        hub.update(PageProperties({hub_prop: hub_prop.page_value(records[:121])}))
+
+
+def test_complete_properties(monkeypatch):
+    from notion_df.entity import Page
+    from notion_df.property import (
+        PageProperties,
+        RelationProperty,
+        RichTextProperty,
+        RollupProperty,
+        RollupPagePropertyValue,
+        TitleProperty,
+    )
+    from notion_df.request.page import RetrievePagePropertyItem
+    from notion_df.rich_text import RichText, TextSpan
+
+    def prop_with_id(prop_cls, name):
+        prop = prop_cls(name)
+        prop.id = name
+        return prop
+
+    relation_value = RelationProperty.page_value([_page(i) for i in range(25)])
+    relation_value.has_more = True
+    properties = PageProperties(
+        {
+            prop_with_id(TitleProperty, "title"): RichText([TextSpan("title")]),
+            prop_with_id(RichTextProperty, "long"): RichText([TextSpan("a")] * 25),
+            prop_with_id(RelationProperty, "relation"): relation_value,
+            prop_with_id(RollupProperty, "count"): RollupPagePropertyValue(
+                "count", "number", 25
+            ),
+            prop_with_id(RollupProperty, "array"): RollupPagePropertyValue(
+                "show_original", "array", []
+            ),
+        }
+    )
+    requested_ids = []
+
+    def execute(self: RetrievePagePropertyItem):
+        requested_ids.append(self.property_id)
+        return None, None, {}
+
+    monkeypatch.setattr(Page, "properties", property(lambda self: properties))
+    monkeypatch.setattr(RetrievePagePropertyItem, "execute", execute)
+    monkeypatch.setattr(Page, "_merge_property_item", lambda self, *args: None)
+    _page(1).complete_properties()
+    assert sorted(requested_ids) == ["count", "long", "relation"]
+
+
+def test_complete_properties_merge(monkeypatch):
+    from notion_df.data import PageData
+    from notion_df.request import page as page_request
+
+    def relation_item(i: int) -> dict:
+        return {
+            "object": "property_item",
+            "id": "rel",
+            "type": "relation",
+            "relation": {"id": str(_page(100 + i).id)},
+        }
+
+    raw = {
+        "object": "page",
+        "id": str(_page(1).id),
+        "parent": {"type": "database_id", "database_id": str(_page(2).id)},
+        "created_time": "2024-01-01T00:00:00.000Z",
+        "last_edited_time": "2024-01-01T00:00:00.000Z",
+        "created_by": {"object": "user", "id": str(_page(3).id)},
+        "last_edited_by": {"object": "user", "id": str(_page(3).id)},
+        "icon": None,
+        "cover": None,
+        "url": "https://www.notion.so/1",
+        "archived": False,
+        "properties": {
+            "relation": {
+                "id": "rel",
+                "type": "relation",
+                "relation": [{"id": str(_page(100 + i).id)} for i in range(25)],
+                "has_more": True,
+            },
+            "count": {
+                "id": "cnt",
+                "type": "rollup",
+                "rollup": {"type": "number", "number": 25, "function": "count"},
+            },
+        },
+    }
+    # the relation of 30 pages, in 2 pages of property items
+    responses = {
+        ("rel", None): {
+            "object": "list",
+            "results": [relation_item(i) for i in range(20)],
+            "has_more": True,
+            "next_cursor": "cursor",
+            "property_item": {"id": "rel", "type": "relation", "relation": {}},
+        },
+        ("rel", "cursor"): {
+            "object": "list",
+            "results": [relation_item(i) for i in range(20, 30)],
+            "has_more": False,
+            "next_cursor": None,
+            "property_item": {"id": "rel", "type": "relation", "relation": {}},
+        },
+        ("cnt", None): {
+            "object": "list",
+            "results": [relation_item(i) for i in range(30)],
+            "has_more": False,
+            "next_cursor": None,
+            "property_item": {
+                "id": "cnt",
+                "type": "rollup",
+                "rollup": {"type": "number", "number": 30, "function": "count"},
+            },
+        },
+    }
+    monkeypatch.setattr(
+        page_request,
+        "request_page",
+        lambda request, start_cursor=None: responses[
+            (request.property_id, start_cursor)
+        ],
+    )
+    data = PageData.deserialize(raw).set_real()
+    try:
+        page = _page(1).complete_properties()
+        relation_value = page.properties["relation"]
+        assert list(relation_value) == [_page(100 + i) for i in range(30)]
+        assert not relation_value.has_more
+        assert page.properties["count"].value == 30
+        assert page.data.raw["properties"]["relation"]["has_more"] is False
+        assert len(page.data.raw["properties"]["relation"]["relation"]) == 30
+        assert page.data.raw["properties"]["count"]["rollup"]["number"] == 30
+        # the property id is kept
+        assert page.data.raw["properties"]["relation"]["id"] == "rel"
+    finally:
+        data.unset_real()
@@ -0,0 +1,19 @@
+import subprocess
+import sys
+from pathlib import Path
+
+_check_import = """
+import sys
+
+import notion_df.entity
+import notion_df.data
+
+for module in ["requests", "tenacity", "dateutil", "loguru"]:
+    assert module not in sys.modules, module
+"""
+
+
+def test_import_defers_heavy_dependencies():
+    subprocess.run(
+        [sys.executable, "-c", _check_import], cwd=Path(__file__).parents[2], check=True
+    )